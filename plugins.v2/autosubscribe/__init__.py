@@ -14,14 +14,17 @@ from app.plugins import _PluginBase
 from app.schemas.context import MediaInfo
 from app.schemas.types import EventType
 from app.schemas.types import MediaType as schemas_MediaType
+from app.utils.http import RequestUtils
 from app.utils.timer import TimerUtils
 from apscheduler.schedulers.background import BackgroundScheduler
-from bs4 import BeautifulSoup
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from db.subscribe_oper import SubscribeOper
 from pathlib import Path
-from playwright.sync_api import sync_playwright
-from typing import List, Tuple, Dict, Any, Optional
+from playwright.async_api import async_playwright
+from typing import List, Tuple, Dict, Any, Optional, Type
+from .fetchers import SiteFetcher
+import asyncio
 import pytz
 import random
 import re
@@ -31,6 +34,218 @@ import traceback
 
 lock = threading.Lock()
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+
+# 通过HTTP获取列表的网站 {网站名称: 获取方式}，优先于浏览器，获取不到时再用浏览器
+# 获取方式的接口和解析需先用网站的真实响应验证后再加入，未加入的网站只用浏览器
+HTTP_FETCHERS: Dict[str, Type[SiteFetcher]] = {}
+
+# 每次提取时重新读取上次末尾的几个条目，这些条目的更新状态可能还没渲染出来
+EXTRACT_OVERLAP = 5
+
+# 在页面内提取条目的脚本，参数为游标(从第几个条目开始提取)，只返回游标之后的条目
+# 返回 {total: 页面中的条目总数, start: 实际开始位置, items: [{title, status, year}]}，条目减少(页面回收了旧节点)时从头提取
+IQIYI_EXTRACT_SCRIPT = """
+(cursor) => {
+    const nodes = document.querySelectorAll('div.tiles-item_container__OaNPB');
+    const start = cursor <= nodes.length ? cursor : 0;
+    const text = (el) => (el ? el.textContent.trim() : null);
+    return {
+        total: nodes.length,
+        start: start,
+        items: Array.from(nodes).slice(start).map((node) => ({
+            title: text(node.querySelector('p.tiles-item_title__H5i8p')),
+            status: text(node.querySelector('span.card-memos_update_info_text__M8ybR')),
+        })),
+    };
+}
+"""
+
+YOUKU_EXTRACT_SCRIPT = """
+(cursor) => {
+    const nodes = document.querySelectorAll('div.categorypack_yk_pack_v');
+    const start = cursor <= nodes.length ? cursor : 0;
+    return {
+        total: nodes.length,
+        start: start,
+        items: Array.from(nodes).slice(start).map((node) => {
+            const link = node.querySelector('div.categorypack_title a');
+            const status = node.querySelector('span.categorypack_p_rb');
+            return {
+                title: link ? link.getAttribute('title') : null,
+                status: status ? status.textContent.trim() : null,
+            };
+        }),
+    };
+}
+"""
+
+QQ_EXTRACT_SCRIPT = """
+(cursor) => {
+    const nodes = document.querySelectorAll('div.item-info');
+    const start = cursor <= nodes.length ? cursor : 0;
+    return {
+        total: nodes.length,
+        start: start,
+        items: Array.from(nodes).slice(start).map((node) => {
+            const title = node.querySelector('span.item-title');
+            const card = node.closest('div.grid__item') || node.parentElement;
+            const posterView = card ? card.querySelector('div.poster-view') : null;
+            let status = null;
+            let year = null;
+            if (posterView) {
+                const label = Array.from(
+                    posterView.querySelectorAll('span.absolute.fourth-label__text')
+                ).find((el) => el.textContent.includes('更新') || el.textContent.includes('全'));
+                status = label ? label.textContent : null;
+                // 年份取本卡片的角标，不是整个页面的第一个
+                const yearLabel = card.querySelector(
+                    'div.poster-view__layer span.fourth-label__text'
+                );
+                year = yearLabel ? yearLabel.textContent.trim() : null;
+            }
+            return {
+                title: title ? title.getAttribute('title') : null,
+                status: status,
+                year: year,
+            };
+        }),
+    };
+}
+"""
+
+
+class BrowserPool:
+    """
+    一次运行内共用的无头浏览器，第一次取页面时才启动，只启动一次，限制同时打开的页面数，
+    页面用完后清理cookie放回池中，供其他网站或重试复用
+    """
+
+    def __init__(self, max_pages: int = 3):
+        self._max_pages = max(int(max_pages), 1)
+        self._playwright = None
+        self._browser = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle_pages: List = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    async def start(self):
+        """
+        准备浏览器池，所有网站都通过HTTP获取成功时不会启动浏览器
+        """
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self._max_pages)
+        self._launch_lock = asyncio.Lock()
+
+    async def __launch(self):
+        """
+        启动浏览器
+        """
+        async with self._launch_lock:
+            if self._closed:
+                raise RuntimeError("浏览器已关闭")
+            if self._browser:
+                return
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            logger.info(f"浏览器已启动，最多同时打开 {self._max_pages} 个页面")
+
+    async def __new_page(self):
+        """
+        新建独立上下文的页面
+        """
+        context = await self._browser.new_context(
+            user_agent=USER_AGENT,
+            locale="zh-CN",
+            timezone_id="Asia/Shanghai",
+        )
+
+        page = await context.new_page()
+
+        await page.evaluate(
+            """
+            () => {
+                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+                Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3]});
+                Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'zh-CN']});
+                delete window.chrome;
+                delete navigator.__proto__.webdriver;
+            }
+        """
+        )
+
+        await page.set_viewport_size(
+            {
+                "width": 1400,
+                "height": 900,
+                "device_scale_factor": 1,
+                "is_mobile": False,
+            }
+        )
+        await page.set_extra_http_headers({"Accept-Language": "zh-CN,zh;q=0.9"})
+        return page
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        从池中取一个页面，用完后放回，出错的页面直接关闭
+        """
+        async with self._semaphore:
+            await self.__launch()
+            page = self._idle_pages.pop() if self._idle_pages else None
+            if page is None or page.is_closed():
+                page = await self.__new_page()
+            try:
+                yield page
+            except BaseException:
+                await self.__close_page(page)
+                raise
+            try:
+                await page.goto("about:blank")
+                await page.context.clear_cookies()
+                self._idle_pages.append(page)
+            except Exception:
+                await self.__close_page(page)
+
+    @staticmethod
+    async def __close_page(page):
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        """
+        关闭浏览器，可重复调用
+        """
+        self._closed = True
+        browser, playwright = self._browser, self._playwright
+        self._browser = None
+        self._playwright = None
+        self._idle_pages = []
+        if browser:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器失败: {str(e)}")
+        if playwright:
+            await playwright.stop()
+            logger.info("浏览器已关闭")
+
+    def shutdown(self, timeout: float = 30):
+        """
+        在其他线程中关闭浏览器，用于停止插件
+        """
+        loop = self._loop
+        if self._closed or not loop or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.close(), loop).result(timeout)
+        except Exception as e:
+            logger.error(f"关闭浏览器失败: {str(e)}")
+
 
 class autoSubscribe(_PluginBase):
     # 插件名称
@@ -40,7 +255,7 @@ class autoSubscribe(_PluginBase):
     # 插件图标
     plugin_icon = "https://raw.githubusercontent.com/BrettDean/MoviePilot-Plugins/main/icons/autosubscribe.png"
     # 插件版本
-    plugin_version = "1.0.6"
+    plugin_version = "1.0.13"
     # 插件作者
     plugin_author = "Dean"
     # 作者主页
@@ -66,6 +281,10 @@ class autoSubscribe(_PluginBase):
     _overwrite_mode: Dict[str, Optional[str]] = {}
     # 每次获取的电视剧数量
     _tv_limit: int = 100
+    # 浏览器同时打开的页面数
+    _max_pages: int = 3
+    # 本次运行共用的浏览器池
+    _browser_pool: Optional[BrowserPool] = None
     # 退出事件
     _event = threading.Event()
 
@@ -85,6 +304,7 @@ class autoSubscribe(_PluginBase):
             self._enabled = config.get("enabled")
             self._onlyonce = config.get("onlyonce")
             self._tv_limit = config.get("tv_limit", 100)
+            self._max_pages = config.get("max_pages", 3)
 
         # 停止现有任务
         self.stop_service()
@@ -125,6 +345,7 @@ class autoSubscribe(_PluginBase):
                 "enabled": self._enabled,
                 "onlyonce": self._onlyonce,
                 "tv_limit": self._tv_limit,
+                "max_pages": self._max_pages,
             }
         )
 
@@ -136,14 +357,14 @@ class autoSubscribe(_PluginBase):
         time.sleep(sleep_time)
 
     # 通用的滚动函数
-    def scroll_down(self, page, selector: str):
+    async def scroll_down(self, page, selector: str):
         """
         通用的滚动函数
         :param page: playwright page对象
         :param selector: 要滚动到的元素的CSS选择器
         """
         for _ in range(1):
-            page.evaluate(
+            await page.evaluate(
                 f"""
                 const items = document.querySelectorAll('{selector}');
                 if (items.length > 0) {{
@@ -152,42 +373,29 @@ class autoSubscribe(_PluginBase):
                 """
             )
             logger.info(f"滚动前随机等待6-40秒")
-            time.sleep(random.randint(6, 40))
-
-    def get_qq_tv_list(self) -> List:
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
+            await asyncio.sleep(random.randint(6, 40))
 
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-                    locale="zh-CN",
-                    timezone_id="Asia/Shanghai",
-                )
-
-                page = context.new_page()
-
-                page.evaluate(
-                    """
-                    () => {
-                        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                        Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3]});
-                        Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'zh-CN']});
-                        delete window.chrome;
-                        delete navigator.__proto__.webdriver;
-                    }
-                """
-                )
+    @staticmethod
+    async def extract_new_items(
+        page, script: str, cursor: int
+    ) -> Tuple[int, int, List[dict]]:
+        """
+        在页面内一次提取游标之后的新条目，不再每次解析整个页面。
+        没有标题的条目(广告位或还没渲染出来)跳过，游标仍然前进，
+        但回退几条，末尾后渲染出的标题和更新状态下次还能读到
+        :param page: playwright page对象
+        :param script: 网站的提取脚本
+        :param cursor: 下次从第几个条目开始提取
+        :return: (页面中的条目总数, 新的游标, 有标题的条目)
+        """
+        result = await page.evaluate(script, cursor)
+        start, items = result["start"], result["items"]
+        cursor = max(start + len(items) - EXTRACT_OVERLAP, start)
+        return result["total"], cursor, [item for item in items if item["title"]]
 
-                page.set_viewport_size(
-                    {
-                        "width": 1400,
-                        "height": 900,
-                        "device_scale_factor": 1,
-                        "is_mobile": False,
-                    }
-                )
-                page.set_extra_http_headers({"Accept-Language": "zh-CN,zh;q=0.9"})
+    async def get_qq_tv_list(self, pool: "BrowserPool") -> List:
+        try:
+            async with pool.page() as page:
 
                 url = "https://v.qq.com/channel/tv/list?filter_params=sort%3D75&page_id=channel_list_second_page&channel_id=100113"
 
@@ -195,7 +403,9 @@ class autoSubscribe(_PluginBase):
                 for retry in range(5):
                     try:
                         logger.info(f"尝试第 {retry + 1} 次加载页面：{url}")
-                        page.goto(url, timeout=30000, wait_until="domcontentloaded")
+                        await page.goto(
+                            url, timeout=30000, wait_until="domcontentloaded"
+                        )
                         break
                     except Exception as e:
                         logger.info(
@@ -203,13 +413,12 @@ class autoSubscribe(_PluginBase):
                         )
                         if retry == 4:  # 最后一次尝试也失败
                             logger.info("页面加载失败次数达到上限，返回空结果")
-                            browser.close()
                             return []
-                        time.sleep(2)
+                        await asyncio.sleep(2)
 
                 # 等待页面加载完成
-                page.wait_for_selector('div[dt-eid="choose_item"]')
-                page.locator(
+                await page.wait_for_selector('div[dt-eid="choose_item"]')
+                await page.locator(
                     "div.filter span.filter__text", has_text="最新上架"
                 ).click()  # 点击最新上架按钮 # 法1:CSS定位
 
@@ -218,71 +427,44 @@ class autoSubscribe(_PluginBase):
                 # ).click()  # 点击最新上架按钮 # 法2:XPath定位
 
                 # 等待内容更新
-                time.sleep(2)
+                await asyncio.sleep(2)
 
                 tv_set = set()  # 使用集合存储不重复的电视剧信息
                 retry_count = 0
                 max_retries = 5
 
-                def process_items():
-                    content = page.content()
-                    soup = BeautifulSoup(content, "html.parser")
-                    tv_items = soup.find_all("div", class_="item-info")
+                cursor = 0
 
-                    for item in tv_items:
-                        try:
-                            title_elem = item.find("span", class_="item-title")
-                            title = (
-                                title_elem.get("title") if title_elem else "未知标题"
-                            )
+                async def process_items():
+                    nonlocal cursor
+                    # 只提取上次之后新加载的条目
+                    total, cursor, tv_items = await self.extract_new_items(
+                        page, QQ_EXTRACT_SCRIPT, cursor
+                    )
 
-                            poster_view = item.find_previous(
-                                "div", class_="poster-view"
-                            )
-                            if poster_view:
-                                update_status = poster_view.find(
-                                    "span",
-                                    class_="absolute fourth-label__text",
-                                    string=lambda x: "更新" in str(x) or "全" in str(x),
-                                )
-                                update_text = (
-                                    update_status.text
-                                    if update_status
-                                    else "暂无更新信息"
-                                )
-                                page.wait_for_selector(
-                                    "div.poster-view__layer span.fourth-label__text",
-                                    timeout=10000,
-                                )
-                                year = (
-                                    page.locator(
-                                        "div.poster-view__layer span.fourth-label__text"
-                                    )
-                                    .nth(0)
-                                    .text_content()
-                                )
-                            else:
-                                update_text = "暂无更新信息"
-
-                            # 将信息转换为元组并添加到集合中
-                            tv_info = (title, update_text, year)
-                            tv_set.add(tv_info)
-                        except Exception as item_error:
-                            logger.info(f"处理条目时出错: {str(item_error)}")
-                            continue
+                    for item in tv_items:
+                        # 角标不是年份时按未知年份处理
+                        year_match = re.search(r"(19|20)\d{2}", item["year"] or "")
+                        # 将信息转换为元组并添加到集合中
+                        tv_info = (
+                            item["title"],
+                            item["status"] or "暂无更新信息",
+                            year_match.group() if year_match else "0",
+                        )
+                        tv_set.add(tv_info)
 
-                    return len(tv_items)
+                    return total
 
                 while len(tv_set) < self._tv_limit:
                     logger.info(f"累计抓取到 {len(tv_set)} 条数据")
-                    current_count = process_items()
+                    current_count = await process_items()
 
                     if len(tv_set) >= self._tv_limit:
                         break
 
-                    self.scroll_down(page, "div.grid__item")
+                    await self.scroll_down(page, "div.grid__item")
 
-                    new_count = process_items()
+                    new_count = await process_items()
                     if new_count == current_count:
                         retry_count += 1
                         if retry_count >= max_retries:
@@ -297,14 +479,13 @@ class autoSubscribe(_PluginBase):
                 # 转换集合为列表并打印结果
                 tv_list = [
                     {"title": title, "status": status, "year": year}
-                    for title, status, year in list(tv_set)[:self._tv_limit]
+                    for title, status, year in list(tv_set)[: self._tv_limit]
                 ]
                 for idx, tv in enumerate(tv_list, start=1):
                     logger.info(
                         f"腾讯视频({idx}/{len(tv_list)}): 剧名: {tv['title']}, 更新状态: {tv['status']}, 年份: {tv['year']}"
                     )
 
-                browser.close()
                 return tv_list
 
         except Exception as e:
@@ -312,47 +493,18 @@ class autoSubscribe(_PluginBase):
             logger.info("腾讯的就是经常会出错")
             return []
 
-    def get_youku_tv_list(self):
+    async def get_youku_tv_list(self, pool: "BrowserPool"):
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-                    locale="zh-CN",
-                    timezone_id="Asia/Shanghai",
-                )
-
-                page = context.new_page()
-
-                page.evaluate(
-                    """
-                    () => {
-                        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                        Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3]});
-                        Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'zh-CN']});
-                        delete window.chrome;
-                        delete navigator.__proto__.webdriver;
-                    }
-                """
-                )
-
-                page.set_viewport_size(
-                    {
-                        "width": 1400,
-                        "height": 900,
-                        "device_scale_factor": 1,
-                        "is_mobile": False,
-                    }
-                )
-                page.set_extra_http_headers({"Accept-Language": "zh-CN,zh;q=0.9"})
+            async with pool.page() as page:
 
                 url = "https://www.youku.com/channel/webtv/list?filter=type_电视剧_sort_1&spm=a2hja.14919748_WEBTV_JINGXUAN.drawer3.d_sort_2"
                 # 打开页面
                 for retry in range(5):
                     try:
                         logger.info(f"尝试第 {retry + 1} 次加载页面：{url}")
-                        page.goto(url, timeout=30000, wait_until="domcontentloaded")
+                        await page.goto(
+                            url, timeout=30000, wait_until="domcontentloaded"
+                        )
                         break
                     except Exception as e:
                         logger.info(
@@ -360,56 +512,43 @@ class autoSubscribe(_PluginBase):
                         )
                         if retry == 4:  # 最后一次尝试也失败
                             logger.info("页面加载失败次数达到上限，返回空结果")
-                            browser.close()
                             return []
-                        time.sleep(2)
+                        await asyncio.sleep(2)
 
                 tv_set = set()  # 使用集合存储不重复的电视剧信息
                 retry_count = 0
                 max_retries = 5
 
-                def process_items():
-                    content = page.content()
-                    soup = BeautifulSoup(content, "html.parser")
-                    tv_items = soup.find_all("div", class_="categorypack_yk_pack_v")
+                cursor = 0
 
-                    for item in tv_items:
-                        try:
-                            # 获取标题
-                            title_elem = item.find("div", class_="categorypack_title")
-                            title = (
-                                title_elem.find("a").get("title")
-                                if title_elem
-                                else "未知标题"
-                            )
-
-                            # 获取更新状态
-                            status_elem = item.find("span", class_="categorypack_p_rb")
-                            update_text = (
-                                status_elem.get_text(strip=True)
-                                if status_elem
-                                else "暂无更新信息"
-                            )
+                async def process_items():
+                    nonlocal cursor
+                    # 只提取上次之后新加载的条目
+                    total, cursor, tv_items = await self.extract_new_items(
+                        page, YOUKU_EXTRACT_SCRIPT, cursor
+                    )
 
-                            # 将信息转换为元组并添加到集合中
-                            tv_info = (title, update_text, "0")
-                            tv_set.add(tv_info)
-                        except Exception as item_error:
-                            logger.info(f"处理条目时出错: {str(item_error)}")
-                            continue
+                    for item in tv_items:
+                        # 将信息转换为元组并添加到集合中
+                        tv_info = (
+                            item["title"],
+                            item["status"] or "暂无更新信息",
+                            "0",
+                        )
+                        tv_set.add(tv_info)
 
-                    return len(tv_items)
+                    return total
 
                 while len(tv_set) < self._tv_limit:
                     logger.info(f"累计抓取到 {len(tv_set)} 条数据")
-                    current_count = process_items()
+                    current_count = await process_items()
 
                     if len(tv_set) >= self._tv_limit:
                         break
 
-                    self.scroll_down(page, "div.categorypack_yk_pack_v")
+                    await self.scroll_down(page, "div.categorypack_yk_pack_v")
 
-                    new_count = process_items()
+                    new_count = await process_items()
                     if new_count == current_count:
                         retry_count += 1
                         if retry_count >= max_retries:
@@ -424,63 +563,33 @@ class autoSubscribe(_PluginBase):
                 # 转换集合为列表并打印结果
                 tv_list = [
                     {"title": title, "status": status, "year": year}
-                    for title, status, year in list(tv_set)[:self._tv_limit]
+                    for title, status, year in list(tv_set)[: self._tv_limit]
                 ]
                 for idx, tv in enumerate(tv_list, start=1):
                     logger.info(
                         f"优酷视频({idx}/{len(tv_list)}): 剧名: {tv['title']}, 更新状态: {tv['status']}, 年份: {tv['year']}"
                     )
 
-                browser.close()
                 return tv_list
 
         except Exception as e:
             logger.info(f"发生错误: {str(e)}， traceback: {traceback.format_exc()}")
             return []
 
-    def get_iqiyi_tv_list(self) -> List:
+    async def get_iqiyi_tv_list(self, pool: "BrowserPool") -> List:
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-                    locale="zh-CN",
-                    timezone_id="Asia/Shanghai",
-                )
-
-                page = context.new_page()
-
-                page.evaluate(
-                    """
-                    () => {
-                        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                        Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3]});
-                        Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'zh-CN']});
-                        delete window.chrome;
-                        delete navigator.__proto__.webdriver;
-                    }
-                """
-                )
-
-                page.set_viewport_size(
-                    {
-                        "width": 1400,
-                        "height": 900,
-                        "device_scale_factor": 1,
-                        "is_mobile": False,
-                    }
-                )
-                page.set_extra_http_headers({"Accept-Language": "zh-CN,zh;q=0.9"})
+            async with pool.page() as page:
 
                 url = "https://www.iqiyi.com/tv/"
                 # 打开页面
                 for retry in range(5):
                     try:
                         logger.info(f"尝试第 {retry + 1} 次加载页面：{url}")
-                        page.goto(url, timeout=30000, wait_until="domcontentloaded")
+                        await page.goto(
+                            url, timeout=30000, wait_until="domcontentloaded"
+                        )
                         logger.debug("爱奇艺有可能作妖，随机等待5-20秒")
-                        time.sleep(random.uniform(5, 20))
+                        await asyncio.sleep(random.uniform(5, 20))
                         break
                     except Exception as e:
                         logger.info(
@@ -488,83 +597,66 @@ class autoSubscribe(_PluginBase):
                         )
                         if retry == 4:  # 最后一次尝试也失败
                             logger.info("页面加载失败次数达到上限，返回空结果")
-                            browser.close()
                             return []
                         logger.debug("爱奇艺有可能作妖，随机等待5-20秒")
-                        time.sleep(random.uniform(5, 20))
+                        await asyncio.sleep(random.uniform(5, 20))
 
                 # 等待并点击"全部剧集"按钮
-                if page.locator(
+                if await page.locator(
                     "div.halo_divContainer__czfwR span#text", has_text="全部剧集"
                 ).is_visible():
                     logger.debug("点击'全部剧集'")
-                    page.locator("div.halo_divContainer__czfwR").filter(
+                    await page.locator("div.halo_divContainer__czfwR").filter(
                         has_text="全部剧集"
                     ).click()
                 else:
                     logger.info("未找到目标元素")
                     return []
                 logger.debug("爱奇艺有可能作妖，随机等待5-20秒")
-                time.sleep(random.uniform(5, 20))
+                await asyncio.sleep(random.uniform(5, 20))
 
                 # 等待并点击"最新"按钮
                 logger.debug("点击'最新'")
-                page.wait_for_selector("div.filmlib_itemwrap__3wgIE")
-                page.locator("div.filmlib_itemwrap__3wgIE", has_text="最新").click()
-                time.sleep(2)
+                await page.wait_for_selector("div.filmlib_itemwrap__3wgIE")
+                await page.locator(
+                    "div.filmlib_itemwrap__3wgIE", has_text="最新"
+                ).click()
+                await asyncio.sleep(2)
 
                 tv_set = set()  # 使用集合存储不重复的电视剧信息
                 retry_count = 0
                 max_retries = 5
 
-                def process_items():
-                    content = page.content()
-                    soup = BeautifulSoup(content, "html.parser")
-                    tv_items = soup.find_all(
-                        "div", class_="tiles-item_container__OaNPB"
+                cursor = 0
+
+                async def process_items():
+                    nonlocal cursor
+                    # 只提取上次之后新加载的条目
+                    total, cursor, tv_items = await self.extract_new_items(
+                        page, IQIYI_EXTRACT_SCRIPT, cursor
                     )
 
                     for item in tv_items:
-                        try:
-                            # 获取标题
-                            title_elem = item.find(
-                                "p", class_="tiles-item_title__H5i8p"
-                            )
-                            title = (
-                                title_elem.get_text(strip=True)
-                                if title_elem
-                                else "未知标题"
-                            )
-
-                            # 获取更新状态
-                            status_elem = item.find(
-                                "span", class_="card-memos_update_info_text__M8ybR"
-                            )
-                            update_text = (
-                                status_elem.get_text(strip=True)
-                                if status_elem
-                                else "暂无更新信息"
-                            )
-
-                            # 将信息转换为元组并添加到集合中
-                            tv_info = (title, update_text, "0")
-                            tv_set.add(tv_info)
-                        except Exception as item_error:
-                            logger.info(f"处理条目时出错: {str(item_error)}")
-                            continue
+                        # 将信息转换为元组并添加到集合中
+                        tv_info = (
+                            item["title"],
+                            item["status"] or "暂无更新信息",
+                            "0",
+                        )
+                        tv_set.add(tv_info)
 
-                    return len(tv_items)
+                    return total
 
                 while len(tv_set) < self._tv_limit:
                     logger.info(f"累计抓取到 {len(tv_set)} 条数据")
-                    current_count = process_items()
+                    current_count = await process_items()
 
                     if len(tv_set) >= self._tv_limit:
                         break
 
-                    self.scroll_down(page, "div.tiles-item_container__OaNPB")
+                    await self.scroll_down(page, "div.tiles-item_container__OaNPB")
 
-                    new_count = process_items()
+                    new_count = await process_items()
                     if new_count == current_count:
                         retry_count += 1
                         if retry_count >= max_retries:
@@ -579,42 +671,110 @@ class autoSubscribe(_PluginBase):
                 # 转换集合为列表并打印结果
                 tv_list = [
                     {"title": title, "status": status, "year": year}
-                    for title, status, year in list(tv_set)[:self._tv_limit]
+                    for title, status, year in list(tv_set)[: self._tv_limit]
                 ]
                 for idx, tv in enumerate(tv_list, start=1):
                     logger.info(
                         f"爱奇艺({idx}/{len(tv_list)}): 剧名: {tv['title']}, 更新状态: {tv['status']}, 年份: {tv['year']}"
                     )
 
-                browser.close()
                 return tv_list
 
         except Exception as e:
             logger.info(f"发生错误: {str(e)}， traceback: {traceback.format_exc()}")
             return []
 
-    def get_tv_list(self) -> List:
-        # 获取爱奇艺视频电视剧列表
-        logger.info("开始获取爱奇艺视频电视剧列表")
-        iqiyi_tv_list = self.get_iqiyi_tv_list() or []
-        if len(iqiyi_tv_list) == 0:
-            iqiyi_tv_list = self.get_iqiyi_tv_list() or []
-        logger.info(f"爱奇艺视频电视剧列表获取完成，共获取到{len(iqiyi_tv_list)}条信息")
-        
-        # 获取优酷视频电视剧列表
-        logger.info("开始获取优酷视频电视剧列表")
-        youku_tv_list = self.get_youku_tv_list() or []
-        if len(youku_tv_list) == 0:
-            youku_tv_list = self.get_youku_tv_list() or []
-        logger.info(f"优酷视频电视剧列表获取完成，共获取到{len(youku_tv_list)}条信息")
-        
-        # 获取腾讯视频电视剧列表
-        logger.info("开始获取腾讯视频电视剧列表")
-        qq_tv_list = self.get_qq_tv_list() or []
-        if len(qq_tv_list) == 0:
-            qq_tv_list = self.get_qq_tv_list() or []
-        logger.info(f"腾讯视频电视剧列表获取完成，共获取到{len(qq_tv_list)}条信息")
+    def get_http_fetcher(self, site_name: str) -> Optional[SiteFetcher]:
+        """
+        获取网站的HTTP获取方式，没有时返回None
+        """
+        fetcher_class = HTTP_FETCHERS.get(site_name)
+        return fetcher_class(get_text=self.http_get_text) if fetcher_class else None
+
+    @staticmethod
+    def http_get_text(url: str) -> Optional[str]:
+        """
+        请求一个地址，返回响应文本，失败时返回None
+        """
+        res = RequestUtils(
+            ua=USER_AGENT,
+            headers={"Accept-Language": "zh-CN,zh;q=0.9"},
+            timeout=30,
+        ).get_res(url)
+        if res is None or res.status_code != 200:
+            logger.info(
+                f"请求失败: {url}，状态码: {res.status_code if res is not None else '无响应'}"
+            )
+            return None
+        return res.text
+
+    async def get_site_tv_list(
+        self,
+        site_name: str,
+        scraper,
+        pool: BrowserPool,
+        fetcher: Optional[SiteFetcher] = None,
+    ) -> List:
+        """
+        获取一个网站的电视剧列表，优先通过HTTP获取，获取不到时再用浏览器，
+        浏览器没获取到时再试一次，重试复用池中的浏览器页面
+        :param site_name: 网站名称
+        :param scraper: 网站的浏览器抓取函数
+        :param pool: 共用的浏览器池
+        :param fetcher: 网站的HTTP获取方式，为None时只用浏览器
+        """
+        logger.info(f"开始获取{site_name}电视剧列表")
+        tv_list = []
+        if fetcher:
+            try:
+                tv_list = await asyncio.to_thread(fetcher.fetch, int(self._tv_limit))
+            except Exception as e:
+                logger.info(
+                    f"通过HTTP获取{site_name}电视剧列表失败: {str(e)}， traceback: {traceback.format_exc()}"
+                )
+            for idx, tv in enumerate(tv_list, start=1):
+                logger.info(
+                    f"{site_name}({idx}/{len(tv_list)}): 剧名: {tv['title']}, 更新状态: {tv['status']}, 年份: {tv['year']}"
+                )
+            if not tv_list:
+                logger.info(f"通过HTTP未获取到{site_name}电视剧列表，改用浏览器获取")
+        if len(tv_list) == 0 and not self._event.is_set():
+            tv_list = await scraper(pool) or []
+        if len(tv_list) == 0 and not self._event.is_set():
+            tv_list = await scraper(pool) or []
+        logger.info(f"{site_name}电视剧列表获取完成，共获取到{len(tv_list)}条信息")
+        return tv_list
+
+    async def get_all_site_tv_lists(self) -> List[List]:
+        """
+        三个网站共用一个浏览器池，同时抓取，总耗时约等于最慢的网站
+        :return: [爱奇艺列表, 优酷列表, 腾讯列表]
+        """
+        pool = BrowserPool(max_pages=self._max_pages)
+        self._browser_pool = pool
+        try:
+            await pool.start()
+            return await asyncio.gather(
+                *(
+                    self.get_site_tv_list(
+                        site_name, scraper, pool, self.get_http_fetcher(site_name)
+                    )
+                    for site_name, scraper in (
+                        ("爱奇艺视频", self.get_iqiyi_tv_list),
+                        ("优酷视频", self.get_youku_tv_list),
+                        ("腾讯视频", self.get_qq_tv_list),
+                    )
+                )
+            )
+        finally:
+            self._browser_pool = None
+            await pool.close()
 
+    def get_tv_list(self) -> List:
+        # 同时获取爱奇艺、优酷、腾讯视频电视剧列表
+        iqiyi_tv_list, youku_tv_list, qq_tv_list = asyncio.run(
+            self.get_all_site_tv_lists()
+        )
 
         # 合并三个列表并根据名字去重，优先保留有年份的
         all_tv_list = []
@@ -1063,6 +1223,25 @@ class autoSubscribe(_PluginBase):
                                     }
                                 ],
                             },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 12, "md": 3},
+                                "content": [
+                                    {
+                                        "component": "VSlider",
+                                        "props": {
+                                            "model": "max_pages",
+                                            "label": "浏览器同时打开的页面数",
+                                            "min": 1,
+                                            "max": 3,
+                                            "step": 1,
+                                            "thumb-label": "always",
+                                            "hide-details": "false",
+                                            "style": "width: 350px",
+                                        },
+                                    }
+                                ],
+                            },
                         ],
                     },
                 ],
@@ -1071,6 +1250,7 @@ class autoSubscribe(_PluginBase):
             "enabled": False,
             "onlyonce": False,
             "tv_limit": 100,
+            "max_pages": 3,
         }
 
     def get_page(self) -> List[dict]:
@@ -1080,6 +1260,9 @@ class autoSubscribe(_PluginBase):
         """
         退出插件
         """
+        # 先关闭浏览器，正在进行的抓取会尽快结束
+        if self._browser_pool:
+            self._browser_pool.shutdown()
         if self._scheduler:
             self._scheduler.remove_all_jobs()
             if self._scheduler.running:
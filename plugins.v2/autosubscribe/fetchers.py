@@ -0,0 +1,143 @@
+"""
+不用浏览器，通过HTTP直接获取网站电视剧列表的方式。
+只依赖标准库，请求由插件传入，解析只依赖响应文本，可以用保存下来的响应离线测试
+"""
+
+import json
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+# 剧集更新状态的特征，不符合的条目(横幅、推荐位等)不是电视剧
+EPISODE_STATUS_PATTERN = re.compile(r"更新|全|集")
+
+
+class SiteFetcher(ABC):
+    """
+    子类提供要请求的地址和解析方法
+    """
+
+    # 网站名称
+    name = ""
+
+    def __init__(self, get_text: Callable[[str], Optional[str]]):
+        """
+        :param get_text: 请求一个地址并返回响应文本的函数，失败时返回None
+        """
+        self._get_text = get_text
+
+    @abstractmethod
+    def urls(self, limit: int) -> List[str]:
+        """
+        要依次请求的地址
+        :param limit: 需要的条目数
+        """
+
+    @abstractmethod
+    def parse(self, text: str) -> List[dict]:
+        """
+        解析一个响应，只返回更新状态符合剧集特征的条目
+        :return: [{"title": 剧名, "status": 更新状态, "year": 年份}]
+        """
+
+    def fetch(self, limit: int) -> List[dict]:
+        """
+        依次请求并解析，直到获取到足够的条目或没有更多条目
+        :param limit: 需要的条目数
+        """
+        tv_list = []
+        seen = set()
+        for idx, url in enumerate(self.urls(limit)):
+            if idx > 0:
+                time.sleep(random.uniform(1, 3))
+            text = self._get_text(url)
+            if not text:
+                break
+            items = self.parse(text)
+            if not items:
+                break
+            for item in items:
+                key = (item["title"], item["status"], item["year"])
+                if key not in seen:
+                    seen.add(key)
+                    tv_list.append(item)
+            if len(tv_list) >= limit:
+                break
+        return tv_list[:limit]
+
+
+class IqiyiFetcher(SiteFetcher):
+    """
+    爱奇艺电视剧频道的列表接口，按最新排序
+    """
+
+    name = "爱奇艺视频"
+    page_size = 48
+
+    def urls(self, limit: int) -> List[str]:
+        return [
+            "https://pcw-api.iqiyi.com/search/recommend/list"
+            f"?channel_id=2&data_type=1&mode=4&page_id={page}&ret_num={self.page_size}"
+            for page in range(1, limit // self.page_size + 2)
+        ]
+
+    def parse(self, text: str) -> List[dict]:
+        data = json.loads(text)
+        if data.get("code") != "A00000":
+            return []
+        tv_list = []
+        for item in (data.get("data") or {}).get("list") or []:
+            title = item.get("name")
+            if not title:
+                continue
+            latest = item.get("latestOrder")
+            total = item.get("videoCount")
+            if latest and total and latest >= total:
+                status = f"{total}集全"
+            elif latest:
+                status = f"更新至{latest}集"
+            else:
+                # 没有集数的是预告、花絮等，不是电视剧
+                continue
+            tv_list.append({"title": title, "status": status, "year": "0"})
+        return tv_list
+
+
+class YoukuFetcher(SiteFetcher):
+    """
+    优酷电视剧列表页，列表数据内嵌在页面的 window.__INITIAL_DATA__ 中
+    """
+
+    name = "优酷视频"
+
+    def urls(self, limit: int) -> List[str]:
+        return [
+            "https://www.youku.com/channel/webtv/list?filter=type_电视剧_sort_1&spm=a2hja.14919748_WEBTV_JINGXUAN.drawer3.d_sort_2"
+        ]
+
+    def parse(self, text: str) -> List[dict]:
+        match = re.search(
+            r"window\.__INITIAL_DATA__\s*=\s*(\{.*?\})\s*;?\s*</script>", text, re.S
+        )
+        if not match:
+            return []
+        tv_list = []
+        # 列表的层级随页面改版变化，找所有带标题和更新状态的条目
+        pending = [json.loads(match.group(1))]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(reversed(node))
+            elif isinstance(node, dict):
+                if node.get("title") and "summary" in node and node.get("videoLink"):
+                    # 横幅、推荐位也有标题和描述，按更新状态过滤
+                    status = node.get("summary") or ""
+                    if EPISODE_STATUS_PATTERN.search(status):
+                        tv_list.append(
+                            {"title": node["title"], "status": status, "year": "0"}
+                        )
+                else:
+                    pending.extend(reversed(list(node.values())))
+        return tv_list
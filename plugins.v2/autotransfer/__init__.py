@@ -1,14 +1,29 @@
 import traceback
 import threading
+import errno
+import queue
+import heapq
 import shutil
 import re
 import pytz
 import os
 import datetime
+import time
+import copy
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
 from typing import List, Tuple, Dict, Any, Optional
 from pathlib import Path
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.schedulers.background import BackgroundScheduler
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 from app.utils.system import SystemUtils
 from app.utils.string import StringUtils
 from app.schemas.types import EventType, MediaType, SystemConfigKey
@@ -18,6 +33,9 @@ from app.modules.filemanager import FileManagerModule
 from app.log import logger
 from app.helper.downloader import DownloaderHelper
 from app.helper.directory import DirectoryHelper
+from app.db import ScopedSession
+from app.db.models.downloadhistory import DownloadHistory
+from app.db.models.transferhistory import TransferHistory
 from app.db.transferhistory_oper import TransferHistoryOper
 from app.db.downloadhistory_oper import DownloadHistoryOper
 from app.core.metainfo import MetaInfoPath
@@ -34,10 +52,819 @@ from app.schemas import (
     TransferInfo,
     TransferDirectoryConf,
     ServiceInfo,
+    TmdbEpisode,
 )
 
-
 lock = threading.Lock()
+# 下载器限速锁，多线程整理时保证只有第一个线程限速、最后一个线程恢复
+speed_limit_lock = threading.Lock()
+
+# 失败文件移动队列空闲多久后结束本批移动并恢复限速(秒)
+RELOCATE_BATCH_IDLE = 5
+# 停止插件时等待正在移动的失败文件的最长时间(秒)
+RELOCATE_STOP_TIMEOUT = 10
+# 无法零拷贝时的复制缓冲区大小
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+# 零拷贝每次复制的大小
+ZERO_COPY_CHUNK_SIZE = 256 * 1024 * 1024
+# 零拷贝不可用时的错误码，换下一种方式复制
+ZERO_COPY_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EBADF,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+}
+
+
+def fast_copy_file(src: str, dst: str) -> str:
+    """
+    复制单个文件，作为shutil.move的copy_function使用。
+    优先copy_file_range(同一文件系统可reflink或由NAS服务端复制)，其次sendfile，都不可用时用大缓冲区复制，
+    复制完成后校验大小，不一致时抛出异常，shutil.move不会删除源文件
+    """
+    size = os.stat(src).st_size
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        copied = 0
+        for method in ("copy_file_range", "sendfile"):
+            if not hasattr(os, method):
+                continue
+            try:
+                while copied < size:
+                    count = min(size - copied, ZERO_COPY_CHUNK_SIZE)
+                    if method == "copy_file_range":
+                        sent = os.copy_file_range(in_fd, out_fd, count, copied, copied)
+                    else:
+                        sent = os.sendfile(out_fd, in_fd, copied, count)
+                    if not sent:
+                        break
+                    copied += sent
+                break
+            except OSError as e:
+                if copied == 0 and e.errno in ZERO_COPY_UNSUPPORTED_ERRNOS:
+                    continue
+                raise
+        if copied < size:
+            # 零拷贝不可用或未复制完，从已复制的位置继续用大缓冲区复制
+            fsrc.seek(copied)
+            fdst.seek(copied)
+            buffer = bytearray(COPY_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = fsrc.readinto(buffer)
+                if not read:
+                    break
+                fdst.write(view[:read])
+    shutil.copystat(src, dst)
+    dst_size = os.stat(dst).st_size
+    if dst_size != size:
+        raise OSError(f"复制 '{src}' 后大小不一致: 源文件 {size}，目标文件 {dst_size}")
+    return dst
+
+
+# 原始语言中文名称
+LANGUAGE_MAPPING = {
+    "kw": "康沃尔语",
+    "ff": "富拉语",
+    "gn": "瓜拉尼语",
+    "id": "印尼语",
+    "lu": "卢巴-加丹加语",
+    "nr": "恩德贝莱语",
+    "os": "奥塞梯语",
+    "ru": "俄语",
+    "se": "北萨米语",
+    "so": "索马里语",
+    "es": "西班牙语",
+    "sv": "瑞典语",
+    "ta": "泰米尔语",
+    "te": "泰卢固语",
+    "tn": "茨瓦纳语",
+    "uk": "乌克兰语",
+    "uz": "乌兹别克语",
+    "el": "希腊语",
+    "co": "科西嘉语",
+    "dv": "迪维希语",
+    "kk": "哈萨克语",
+    "ki": "基库尤语",
+    "or": "奥里亚语",
+    "si": "僧伽罗语",
+    "st": "索托语",
+    "sr": "塞尔维亚语",
+    "ss": "斯瓦蒂语",
+    "tr": "土耳其语",
+    "wa": "瓦隆语",
+    "cn": "粤语",
+    "bi": "比斯拉马语",
+    "cr": "克里语",
+    "cy": "威尔士语",
+    "eu": "巴斯克语",
+    "hz": "赫雷罗语",
+    "ho": "希里莫图语",
+    "ka": "格鲁吉亚语",
+    "kr": "卡努里语",
+    "km": "高棉语",
+    "kj": "宽亚玛语",
+    "to": "汤加语",
+    "vi": "越南语",
+    "zu": "祖鲁语",
+    "zh": "中文",
+    "ps": "普什图语",
+    "mk": "马其顿语",
+    "ae": "阿维斯陀语",
+    "az": "阿塞拜疆语",
+    "ba": "巴什基尔语",
+    "sh": "塞尔维亚-克罗地亚语",
+    "lv": "拉脱维亚语",
+    "lt": "立陶宛语",
+    "ms": "马来语",
+    "rm": "罗曼什语",
+    "as": "阿萨姆语",
+    "gd": "盖尔语",
+    "ja": "日语",
+    "ko": "韩语",
+    "ku": "库尔德语",
+    "mo": "摩尔多瓦语",
+    "mn": "蒙古语",
+    "nb": "书面挪威语",
+    "om": "奥罗莫语",
+    "pi": "巴利语",
+    "sq": "阿尔巴尼亚语",
+    "vo": "沃拉普克语",
+    "bo": "藏语",
+    "da": "丹麦语",
+    "kl": "格陵兰语",
+    "kn": "卡纳达语",
+    "nl": "荷兰语",
+    "nn": "新挪威语",
+    "sa": "梵语",
+    "am": "阿姆哈拉语",
+    "hy": "亚美尼亚语",
+    "bs": "波斯尼亚语",
+    "hr": "克罗地亚语",
+    "mh": "马绍尔语",
+    "mg": "马拉加斯语",
+    "ne": "尼泊尔语",
+    "su": "巽他语",
+    "ts": "聪加语",
+    "ug": "维吾尔语",
+    "cs": "捷克语",
+    "jv": "爪哇语",
+    "ro": "罗马尼亚语",
+    "sm": "萨摩亚语",
+    "tg": "塔吉克语",
+    "wo": "沃洛夫语",
+    "br": "布列塔尼语",
+    "fr": "法语",
+    "ga": "爱尔兰语",
+    "ht": "海地克里奥尔语",
+    "kv": "科米语",
+    "mi": "毛利语",
+    "th": "泰语",
+    "xx": "无语言",
+    "af": "南非荷兰语",
+    "av": "阿瓦尔语",
+    "bm": "班巴拉语",
+    "ca": "加泰罗尼亚语",
+    "ce": "车臣语",
+    "de": "德语",
+    "gv": "马恩语",
+    "rw": "卢旺达语",
+    "ky": "吉尔吉斯语",
+    "ln": "林加拉语",
+    "sn": "绍纳语",
+    "yi": "意第绪语",
+    "be": "白俄罗斯语",
+    "cu": "教会斯拉夫语",
+    "dz": "宗喀语",
+    "eo": "世界语",
+    "fi": "芬兰语",
+    "fy": "弗里西语",
+    "ie": "西方国际语",
+    "ia": "国际语",
+    "it": "意大利语",
+    "ng": "恩敦加语",
+    "pa": "旁遮普语",
+    "pt": "葡萄牙语",
+    "rn": "隆迪语",
+    "fa": "波斯语",
+    "ch": "查莫罗语",
+    "cv": "楚瓦什语",
+    "en": "英语",
+    "hu": "匈牙利语",
+    "ii": "彝语",
+    "kg": "刚果语",
+    "li": "林堡语",
+    "ml": "马拉雅拉姆语",
+    "nv": "纳瓦霍语",
+    "ny": "齐切瓦语",
+    "sg": "桑戈语",
+    "tw": "契维语",
+    "ab": "阿布哈兹语",
+    "ar": "阿拉伯语",
+    "ee": "埃维语",
+    "fo": "法罗语",
+    "ik": "伊努皮克语",
+    "ks": "克什米尔语",
+    "lb": "卢森堡语",
+    "nd": "北恩德贝莱语",
+    "oc": "奥克语",
+    "sk": "斯洛伐克语",
+    "tt": "鞑靼语",
+    "ve": "文达语",
+    "ay": "艾马拉语",
+    "fj": "斐济语",
+    "gu": "古吉拉特语",
+    "io": "伊多语",
+    "lo": "老挝语",
+    "la": "拉丁语",
+    "no": "挪威语",
+    "oj": "奥吉布瓦语",
+    "pl": "波兰语",
+    "qu": "克丘亚语",
+    "sl": "斯洛文尼亚语",
+    "sc": "萨丁尼亚语",
+    "sw": "斯瓦希里语",
+    "tl": "他加禄语",
+    "ur": "乌尔都语",
+    "bg": "保加利亚语",
+    "hi": "印地语",
+    "yo": "约鲁巴语",
+    "ak": "阿坎语",
+    "an": "阿拉贡语",
+    "bn": "孟加拉语",
+    "et": "爱沙尼亚语",
+    "gl": "加利西亚语",
+    "ha": "豪萨语",
+    "ig": "伊博语",
+    "iu": "因纽特语",
+    "lg": "卢干达语",
+    "mr": "马拉地语",
+    "mt": "马耳他语",
+    "my": "缅甸语",
+    "na": "瑙鲁语",
+    "sd": "信德语",
+    "xh": "科萨语",
+    "za": "壮语",
+    "aa": "阿法尔语",
+    "is": "冰岛语",
+    "ty": "塔希提语",
+    "ti": "提格利尼亚语",
+    "tk": "土库曼语",
+    "he": "希伯来语",
+}
+
+# 完结状态中文名称
+STATUS_TRANSLATION = {
+    "Returning Series": "回归系列",
+    "Ended": "已完结",
+    "In Production": "制作中",
+    "Canceled": "已取消",
+    "Planned": "计划中",
+    "Released": "已发布",
+}
+
+
+class NotifyAggregator:
+    """
+    入库消息汇总，同一媒体同一季的文件按路径去重，
+    每个媒体的发送时间放入最小堆，检查时只取出已到发送时间的媒体
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 媒体 -> {"files": {文件路径: 文件信息}, "deadline": 发送时间}
+        self._groups: Dict[str, dict] = {}
+        # (发送时间, 媒体)，媒体有新文件时发送时间后延，旧的条目在取出时丢弃
+        self._deadlines: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def add(self, key: str, path: str, item: dict, delay: float):
+        """
+        添加一个入库文件，已存在的文件不重复添加，媒体的发送时间延后到delay秒之后
+        """
+        deadline = time.time() + delay
+        with self._lock:
+            group = self._groups.setdefault(key, {"files": {}, "deadline": deadline})
+            group["files"].setdefault(path, item)
+            group["deadline"] = deadline
+            heapq.heappush(self._deadlines, (deadline, key))
+
+    def pop_due(self) -> List[Tuple[str, List[dict]]]:
+        """
+        取出已到发送时间的媒体及其文件
+        """
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                deadline, key = heapq.heappop(self._deadlines)
+                group = self._groups.get(key)
+                if not group or group["deadline"] != deadline:
+                    continue
+                del self._groups[key]
+                due.append((key, list(group["files"].values())))
+        return due
+
+
+class FileMonitorHandler(FileSystemEventHandler):
+    """
+    目录监控响应类，只记录变化的文件，由插件防抖后再整理
+    """
+
+    def __init__(self, mon_path: str, sync: Any, **kwargs):
+        super(FileMonitorHandler, self).__init__(**kwargs)
+        self._watch_path = mon_path
+        self.sync = sync
+
+    def on_created(self, event):
+        if event.is_directory:
+            return
+        self.sync.event_handler(mon_path=self._watch_path, event_path=event.src_path)
+
+    def on_modified(self, event):
+        if event.is_directory:
+            return
+        self.sync.event_handler(mon_path=self._watch_path, event_path=event.src_path)
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        self.sync.event_handler(mon_path=self._watch_path, event_path=event.dest_path)
+
+
+class MemoCache:
+    """
+    线程安全的LRU缓存，带过期时间和命中统计，同一个key并发未命中时只加载一次
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: OrderedDict = OrderedDict()
+        self._loading: Dict[Any, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key) -> Tuple[bool, Any]:
+        """
+        查询缓存
+        :return: (是否命中, 缓存值)
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, item[1]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        查询缓存，未命中时调用loader加载并缓存结果，
+        结果为空时不缓存（可能是网络等临时失败），下次查询重新加载
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            # 等待其他线程加载完成后再查一次
+            with self._lock:
+                item = self._data.get(key)
+                if item is not None and item[0] > time.time():
+                    return item[1]
+            try:
+                value = loader()
+                if value:
+                    self.put(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        return f"命中 {self.hits} 次，未命中 {self.misses} 次，命中率 {rate:.1f}%"
+
+    def to_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0,
+        }
+
+
+class KeywordMatcher:
+    """
+    预编译的关键字匹配器，所有关键字合并为一个正则，一次扫描即可判断是否命中，并返回命中的关键字
+    """
+
+    # 开头的全局内联标记，如 (?i)，合并时需改为作用域标记 (?i:...)
+    _INLINE_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+    # 含反向引用的关键字合并后分组序号会变化，只能单独匹配
+    _BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+
+    def __init__(self, keywords: List[str], flags: int = 0):
+        self.keywords = [keyword for keyword in keywords or [] if keyword]
+        self._combined = None
+        self._group_keywords: Dict[str, str] = {}
+        self._separate: List[Tuple[str, re.Pattern]] = []
+        compiled = []
+        parts = []
+        for idx, keyword in enumerate(self.keywords):
+            try:
+                pattern = re.compile(keyword, flags)
+            except re.error as e:
+                logger.error(f"关键字 {keyword} 不是有效的正则表达式，已忽略: {str(e)}")
+                continue
+            compiled.append((keyword, pattern))
+            if self._BACKREF.search(keyword):
+                self._separate.append((keyword, pattern))
+                continue
+            inline_flags = self._INLINE_FLAGS.match(keyword)
+            if inline_flags:
+                body = f"(?{inline_flags.group(1)}:{keyword[inline_flags.end():]})"
+            else:
+                body = keyword
+            self._group_keywords[f"k{idx}"] = keyword
+            parts.append(f"(?P<k{idx}>{body})")
+        if parts:
+            try:
+                self._combined = re.compile("|".join(parts), flags)
+            except re.error:
+                # 合并失败(如关键字中有同名分组)，全部单独匹配
+                self._combined = None
+                self._group_keywords = {}
+                self._separate = compiled
+
+    def __bool__(self) -> bool:
+        return bool(self._combined or self._separate)
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        匹配文本
+        :return: 命中的关键字，未命中返回None
+        """
+        if self._combined:
+            result = self._combined.search(text)
+            if result:
+                return self._group_keywords.get(result.lastgroup, result.group(0))
+        for keyword, pattern in self._separate:
+            if pattern.search(text):
+                return keyword
+        return None
+
+
+class FileStateIndex:
+    """
+    文件状态索引，以(路径, 大小, 修改时间, inode)判断文件是否有变化，并记录上次的处理结果，
+    没有变化的文件在下次扫描时直接跳过，不再查询数据库。
+    内存中每条记录末尾多一个本次运行是否扫描到的标记，不保存，用于清理已不存在的文件记录
+    """
+
+    # 处理结果
+    TRANSFERRED = "transferred"
+    EXCLUDED = "excluded"
+    UNRECOGNIZED = "unrecognized"
+    TOO_SMALL = "too_small"
+    # 与过滤配置相关的结果，配置变化后需要重新判断
+    CONFIG_DEPENDENT = (EXCLUDED, TOO_SMALL)
+
+    def __init__(self, data: Optional[dict] = None, fingerprint: str = ""):
+        self._lock = threading.Lock()
+        self._fingerprint = fingerprint
+        self._entries: Dict[str, list] = {}
+        # 加载后是否有新增、修改或清理的记录，没有变化时不需要保存
+        self.dirty = False
+        if data:
+            entries = data.get("entries") or {}
+            if data.get("fingerprint") != fingerprint:
+                # 过滤配置有变化，丢弃排除类的结果
+                entries = {
+                    path: entry
+                    for path, entry in entries.items()
+                    if entry[-1] not in self.CONFIG_DEPENDENT
+                }
+                self.dirty = True
+            self._entries = {path: entry + [False] for path, entry in entries.items()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def signature(file_stat: os.stat_result) -> list:
+        """
+        文件签名
+        """
+        return [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino]
+
+    def lookup(self, path: str, file_stat: os.stat_result) -> Optional[str]:
+        """
+        查询文件上次的处理结果，文件有变化时返回None，同时标记本次扫描到了该文件
+        """
+        entry = self._entries.get(path)
+        if not entry:
+            return None
+        entry[4] = True
+        if entry[:3] != self.signature(file_stat):
+            return None
+        return entry[3]
+
+    def record(self, path: str, file_stat: Optional[os.stat_result], status: str):
+        """
+        记录文件的处理结果
+        """
+        if file_stat is None:
+            return
+        entry = self.signature(file_stat) + [status, True]
+        with self._lock:
+            if self._entries.get(path, [])[:4] != entry[:4]:
+                self.dirty = True
+            self._entries[path] = entry
+
+    def prune(self, directory: str):
+        """
+        删除目录下本次扫描未出现的文件记录
+        """
+        prefix = str(Path(directory)).rstrip(os.sep) + os.sep
+        with self._lock:
+            for path in [
+                path
+                for path, entry in self._entries.items()
+                if path.startswith(prefix) and not entry[4]
+            ]:
+                del self._entries[path]
+                self.dirty = True
+
+    def to_dict(self) -> dict:
+        """
+        导出用于保存的数据，同时清除修改标记
+        """
+        with self._lock:
+            self.dirty = False
+            return {
+                "fingerprint": self._fingerprint,
+                "entries": {path: entry[:4] for path, entry in self._entries.items()},
+            }
+
+
+# 运行统计项的中文名称，用于日志汇总
+METRIC_LABELS = {
+    # 阶段
+    "prefetch_history": "预取历史记录",
+    "recognize": "媒体识别",
+    "tmdb_episodes": "获取集信息",
+    "get_dir": "查询目的目录",
+    "speed_limit": "下载器限速",
+    "transfer": "文件转移",
+    "history": "写入历史记录",
+    "scrape": "刮削",
+    "del_empty_dirs": "删除空目录",
+    # 跳过原因
+    "unchanged": "未变化",
+    "transferred": "已整理",
+    "hidden": "回收站或隐藏文件",
+    "exclude_keyword": "过滤关键字",
+    "transfer_exclude": "整理屏蔽词",
+    "not_media": "非媒体文件",
+    "unrecognized": "无法识别",
+    "too_small": "文件过小",
+    "busy": "正在整理",
+    # 失败原因
+    "no_file_item": "未找到文件",
+    "no_mediainfo": "未识别到媒体信息",
+    "no_target": "未配置目的目录",
+    "transfer_error": "转移模块失败",
+    "transfer_failed": "入库失败",
+    "error": "异常",
+}
+
+
+class RunMetrics:
+    """
+    单次运行的统计，记录文件数、跳过及失败原因、转移大小和各阶段耗时，线程安全
+    """
+
+    def __init__(self, trigger: str = ""):
+        self._lock = threading.Lock()
+        self.trigger = trigger
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.seen = 0
+        self.transferred = 0
+        self.transferred_bytes = 0
+        self.skipped: Dict[str, int] = {}
+        self.failed: Dict[str, int] = {}
+        # 阶段名 -> [次数, 总耗时, 最长耗时]
+        self.stages: Dict[str, list] = {}
+        # 监控目录 -> {发现, 成功, 失败, 大小, 在途文件数, 开始时间, 结束时间}
+        self.dirs: Dict[str, dict] = {}
+        # 运行结束时的缓存命中情况
+        self.caches: Dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        统计一个阶段的耗时
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            stage = self.stages.setdefault(name, [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += seconds
+            stage[2] = max(stage[2], seconds)
+
+    def __dir(self, mon_path: Optional[str]) -> dict:
+        """
+        监控目录的统计，需在锁内调用
+        """
+        if mon_path is None:
+            return {}
+        return self.dirs.setdefault(
+            mon_path,
+            {
+                "seen": 0,
+                "transferred": 0,
+                "failed": 0,
+                "bytes": 0,
+                "queued": 0,
+                "start_time": time.time(),
+                "end_time": None,
+            },
+        )
+
+    def begin_dir(self, mon_path: str):
+        with self._lock:
+            self.__dir(mon_path)
+
+    def end_dir(self, mon_path: str):
+        with self._lock:
+            stats = self.__dir(mon_path)
+            stats["queued"] = 0
+            stats["end_time"] = time.time()
+
+    def set_queued(self, mon_path: str, count: int):
+        with self._lock:
+            self.__dir(mon_path)["queued"] = count
+
+    def add_seen(self, count: int = 1, mon_path: Optional[str] = None):
+        with self._lock:
+            self.seen += count
+            stats = self.__dir(mon_path)
+            stats["seen"] = stats.get("seen", 0) + count
+
+    def skip(self, reason: str, count: int = 1):
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + count
+
+    def fail(self, reason: str, mon_path: Optional[str] = None):
+        with self._lock:
+            self.failed[reason] = self.failed.get(reason, 0) + 1
+            stats = self.__dir(mon_path)
+            stats["failed"] = stats.get("failed", 0) + 1
+
+    def success(self, size: int, mon_path: Optional[str] = None):
+        with self._lock:
+            self.transferred += 1
+            self.transferred_bytes += size or 0
+            stats = self.__dir(mon_path)
+            stats["transferred"] = stats.get("transferred", 0) + 1
+            stats["bytes"] = stats.get("bytes", 0) + (size or 0)
+
+    def finish(self):
+        if self.end_time is None:
+            self.end_time = time.time()
+
+    @property
+    def elapsed(self) -> float:
+        return max((self.end_time or time.time()) - self.start_time, 0.001)
+
+    def __dir_elapsed(self, stats: dict) -> float:
+        end_time = stats["end_time"] or self.end_time or time.time()
+        return max(end_time - stats["start_time"], 0.001)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            elapsed = self.elapsed
+            return {
+                "trigger": self.trigger,
+                "start_time": datetime.datetime.fromtimestamp(self.start_time).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+                "end_time": (
+                    datetime.datetime.fromtimestamp(self.end_time).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    )
+                    if self.end_time
+                    else None
+                ),
+                "running": self.end_time is None,
+                "elapsed": round(elapsed, 3),
+                "seen": self.seen,
+                "transferred": self.transferred,
+                "transferred_bytes": self.transferred_bytes,
+                "failed": sum(self.failed.values()),
+                "failed_reasons": dict(self.failed),
+                "skipped": sum(self.skipped.values()),
+                "skipped_reasons": dict(self.skipped),
+                "files_per_minute": round(self.transferred / elapsed * 60, 2),
+                "mib_per_second": round(self.transferred_bytes / 2**20 / elapsed, 2),
+                "dirs": {
+                    mon_path: {
+                        "seen": stats["seen"],
+                        "transferred": stats["transferred"],
+                        "failed": stats["failed"],
+                        "transferred_bytes": stats["bytes"],
+                        "queued": stats["queued"],
+                        "running": stats["end_time"] is None and self.end_time is None,
+                        "files_per_minute": round(
+                            stats["transferred"] / self.__dir_elapsed(stats) * 60,
+                            2,
+                        ),
+                        "mib_per_second": round(
+                            stats["bytes"] / 2**20 / self.__dir_elapsed(stats), 2
+                        ),
+                    }
+                    for mon_path, stats in self.dirs.items()
+                },
+                "caches": dict(self.caches),
+                "stages": {
+                    name: {
+                        "count": count,
+                        "total": round(total, 3),
+                        "avg": round(total / count, 3) if count else 0,
+                        "max": round(longest, 3),
+                    }
+                    for name, (count, total, longest) in self.stages.items()
+                },
+            }
+
+    def summary(self) -> str:
+        """
+        日志汇总
+        """
+        data = self.to_dict()
+
+        def reasons(items: dict) -> str:
+            return "，".join(
+                f"{METRIC_LABELS.get(key, key)} {value}" for key, value in items.items()
+            )
+
+        text = (
+            f"发现 {data['seen']} 个文件，整理成功 {data['transferred']} 个 "
+            f"({data['transferred_bytes'] / 2**30:.2f} GiB)，"
+            f"失败 {data['failed']} 个，跳过 {data['skipped']} 个，"
+            f"耗时 {data['elapsed']:.1f} 秒，"
+            f"吞吐量 {data['files_per_minute']:.2f} 个/分钟，"
+            f"{data['mib_per_second']:.2f} MiB/s"
+        )
+        if data["skipped_reasons"]:
+            text += f"\n跳过原因: {reasons(data['skipped_reasons'])}"
+        if data["failed_reasons"]:
+            text += f"\n失败原因: {reasons(data['failed_reasons'])}"
+        if data["stages"]:
+            text += "\n各阶段耗时: " + "，".join(
+                f"{METRIC_LABELS.get(name, name)} {stage['total']:.1f}秒/{stage['count']}次"
+                f"(最长{stage['max']:.1f}秒)"
+                for name, stage in sorted(
+                    data["stages"].items(), key=lambda item: -item[1]["total"]
+                )
+            )
+        return text
 
 
 class autoTransfer(_PluginBase):
@@ -48,7 +875,7 @@ class autoTransfer(_PluginBase):
     # 插件图标
     plugin_icon = "https://raw.githubusercontent.com/BrettDean/MoviePilot-Plugins/main/icons/autotransfer.png"
     # 插件版本
-    plugin_version = "1.0.35"
+    plugin_version = "1.0.55"
     # 插件作者
     plugin_author = "Dean"
     # 作者主页
@@ -84,8 +911,6 @@ class autoTransfer(_PluginBase):
     _cron = None
     filetransfer = None
     _size = 0
-    # 取消限速开关
-    _pre_cancel_speed_limit = False
     # 转移方式
     _transfer_type = "move"
     _monitor_dirs = ""
@@ -96,11 +921,70 @@ class autoTransfer(_PluginBase):
     # 存储源目录转移方式
     _transferconf: Dict[str, Optional[str]] = {}
     _overwrite_mode: Dict[str, Optional[str]] = {}
-    _medias = {}
+    # 入库消息汇总
+    _notify_aggregator: Optional[NotifyAggregator] = None
     # 退出事件
     _event = threading.Event()
     _move_failed_files = True
     _move_excluded_files = True
+    # 整理线程数，0为按目的目录所在设备数自动分配
+    _max_workers: int = 1
+    # 正在处理的文件，防止多线程重复整理
+    _processing: set = set()
+    # 下载器限速引用计数及限速前的速度
+    _speed_limit_refs: int = 0
+    _speed_limit_applied = False
+    # 限速方式 session: 整理期间只限速一次，结束后恢复；per_file: 每个文件单独限速
+    _speed_limit_mode = "session"
+    # 进行中的限速会话数，及会话中是否已检查过下载器限速
+    _speed_limit_sessions: int = 0
+    _speed_limit_checked = False
+    # 已连接下载器缓存及其过期时间，避免每次限速都重新检查连接
+    _service_info_cache: Optional[Dict[str, ServiceInfo]] = None
+    _service_info_expire: float = 0
+    _service_info_ttl: int = 60
+    # 增量扫描，跳过未变化且已有处理结果的文件
+    _incremental_scan = True
+    _file_index: Optional[FileStateIndex] = None
+    # 实时监控，定时任务作为兜底
+    _realtime = False
+    # 实时监控防抖时间，文件在此时间内无变化才整理
+    _realtime_delay: int = 30
+    _observers: List[Any] = []
+    # 待整理的实时监控事件 {文件路径: (监控目录, 最后变化时间, 文件大小)}
+    _pending_events: Dict[str, Tuple[str, float, int]] = {}
+    # 批量预取的历史记录 {监控目录: (已整理的源路径, {下载路径: (tmdbid, type)})}
+    _history_prefetch: Dict[str, Tuple[set, Dict[str, Tuple[Any, Any]]]] = {}
+    # 移动模式下有文件被移走的目录 {监控目录: {目录}}，用于统一删除空目录
+    _touched_dirs: Dict[str, set] = {}
+    # 刮削线程数
+    _scrape_workers: int = 2
+    # 已提交还未开始刮削的目的目录，同一目录只排队一次
+    _scrape_pending: set = set()
+    # 正在刮削的目的目录 {目录: [锁, 使用数]}，同一目录的刮削依次进行
+    _scrape_dir_locks: Dict[str, list] = {}
+    _scrape_lock = threading.Lock()
+    # 监控目录并行方式 dir: 按目录并行；device: 按磁盘并行；空: 逐个目录处理
+    _parallel_dirs = ""
+    # 媒体识别缓存，同一季的剧集只识别一次
+    _recognize_cache: Optional[MemoCache] = None
+    # 本次运行的集信息缓存，所有监控目录共用
+    _episodes_cache: Optional[MemoCache] = None
+    # 集信息持久化缓存时间(分钟)，0为不持久化
+    _episodes_cache_ttl: int = 0
+    # 正在进行的定时整理的运行统计
+    _current_metrics: Optional[RunMetrics] = None
+    # 最近几次运行的统计
+    _metrics_history: Optional[deque] = None
+    # 最近整理失败的文件
+    _recent_failures: Optional[deque] = None
+    # 待移动的失败文件 (失败原因, 文件路径)，由后台线程移动，不阻塞整理
+    _relocate_queue: Optional[queue.Queue] = None
+    _relocate_thread: Optional[threading.Thread] = None
+    _relocate_stop: Optional[threading.Event] = None
+    # 预编译的过滤关键字和整理屏蔽词
+    _exclude_matcher: Optional[KeywordMatcher] = None
+    _transfer_exclude_matcher: Optional[KeywordMatcher] = None
 
     def init_plugin(self, config: dict = None):
         self.transferhis = TransferHistoryOper()
@@ -116,6 +1000,20 @@ class autoTransfer(_PluginBase):
         self._dirconf = {}
         self._transferconf = {}
         self._overwrite_mode = {}
+        self._processing = set()
+        self._pending_events = {}
+        self._history_prefetch = {}
+        self._touched_dirs = {}
+        self._scrape_pending = set()
+        self._scrape_dir_locks = {}
+        if self._notify_aggregator is None:
+            self._notify_aggregator = NotifyAggregator()
+        if self._metrics_history is None:
+            self._metrics_history = deque(maxlen=10)
+        if self._recent_failures is None:
+            self._recent_failures = deque(maxlen=20)
+        self._recognize_cache = MemoCache(maxsize=512, ttl=3600)
+        self.invalidate_service_info()
 
         # 读取配置
         if config:
@@ -140,10 +1038,24 @@ class autoTransfer(_PluginBase):
             self._downloaders = config.get("downloaders") or ["不限速-autoTransfer"]
             self._move_failed_files = config.get("move_failed_files", True)
             self._move_excluded_files = config.get("move_excluded_files", True)
-            self._pre_cancel_speed_limit = config.get("pre_cancel_speed_limit", False)
+            self._max_workers = config.get("max_workers")
+            if self._max_workers in (None, ""):
+                self._max_workers = 1
+            self._incremental_scan = config.get("incremental_scan", True)
+            self._realtime = config.get("realtime") or False
+            self._realtime_delay = config.get("realtime_delay") or 30
+            self._episodes_cache_ttl = config.get("episodes_cache_ttl") or 0
+            self._speed_limit_mode = config.get("speed_limit_mode") or "session"
+            self._scrape_workers = config.get("scrape_workers") or 2
+            self._parallel_dirs = config.get("parallel_dirs") or ""
+
+        # 预编译过滤关键字，整理屏蔽词在使用时检查系统配置是否变化
+        self._exclude_matcher = KeywordMatcher(self._exclude_keywords.split("\n"))
+        self._transfer_exclude_matcher = None
 
         # 停止现有任务
         self.stop_service()
+        self._observers = []
 
         if self._enabled or self._onlyonce:
             # 定时服务管理器
@@ -212,12 +1124,23 @@ class autoTransfer(_PluginBase):
                     except Exception as e:
                         logger.debug(str(e))
 
+                    # 实时监控
+                    if self._realtime:
+                        self.__start_observer(mon_path)
+
+            if self._enabled and self._observers:
+                # 实时监控事件防抖后整理
+                self._scheduler.add_job(
+                    self.__flush_pending_events, trigger="interval", seconds=5
+                )
+
             # 运行一次定时服务
             if self._onlyonce:
                 logger.info("立即运行一次")
                 self._scheduler.add_job(
                     name="autotransfer整理文件",
                     func=self.main,
+                    kwargs={"full_scan": True},
                     trigger="date",
                     run_date=datetime.datetime.now(tz=pytz.timezone(settings.TZ))
                     + datetime.timedelta(seconds=3),
@@ -259,14 +1182,44 @@ class autoTransfer(_PluginBase):
                 "downloaders": self._downloaders,
                 "move_failed_files": self._move_failed_files,
                 "move_excluded_files": self._move_excluded_files,
-                "pre_cancel_speed_limit": self._pre_cancel_speed_limit,
+                "max_workers": self._max_workers,
+                "incremental_scan": self._incremental_scan,
+                "realtime": self._realtime,
+                "realtime_delay": self._realtime_delay,
+                "episodes_cache_ttl": self._episodes_cache_ttl,
+                "speed_limit_mode": self._speed_limit_mode,
+                "scrape_workers": self._scrape_workers,
+                "parallel_dirs": self._parallel_dirs,
             }
         )
 
     @property
     def service_info(self) -> Optional[ServiceInfo]:
         """
-        服务信息
+        服务信息，已连接的下载器缓存一段时间，调用失败时失效
+        """
+        if (
+            self._service_info_cache is not None
+            and time.time() < self._service_info_expire
+        ):
+            return self._service_info_cache
+
+        active_services = self.__get_active_services()
+        if active_services:
+            self._service_info_cache = active_services
+            self._service_info_expire = time.time() + self._service_info_ttl
+        return active_services
+
+    def invalidate_service_info(self):
+        """
+        下载器缓存失效，下次访问service_info时重新检查连接
+        """
+        self._service_info_cache = None
+        self._service_info_expire = 0
+
+    def __get_active_services(self) -> Optional[Dict[str, ServiceInfo]]:
+        """
+        获取已连接的qb下载器
         """
         if not self._downloaders:
             logger.warning("尚未配置下载器，请检查配置")
@@ -295,35 +1248,6 @@ class autoTransfer(_PluginBase):
 
         return active_services
 
-    def set_download_limit(self, download_limit):
-        try:
-            try:
-                download_limit = int(download_limit)
-            except Exception as e:
-                logger.error(
-                    f"download_limit 转换失败 {str(e)}, traceback={traceback.format_exc()}"
-                )
-                return False
-
-            flag = True
-            for service in self.service_info.values():
-                downloader_name = service.name
-                downloader_obj = service.instance
-                if not downloader_obj:
-                    logger.error(f"获取下载器失败 {downloader_name}")
-                    continue
-                _, upload_limit_current_val = downloader_obj.get_speed_limit()
-                flag = flag and downloader_obj.set_speed_limit(
-                    download_limit=int(download_limit),
-                    upload_limit=int(upload_limit_current_val),
-                )
-            return flag
-        except Exception as e:
-            logger.error(
-                f"设置下载限速失败 {str(e)}, traceback={traceback.format_exc()}"
-            )
-            return False
-
     def check_is_qb(self, service_info) -> bool:
         """
         检查下载器类型是否为 qbittorrent 或 transmission
@@ -338,63 +1262,317 @@ class autoTransfer(_PluginBase):
             return False
         return False
 
-    def get_downloader_limit_current_val(self):
+    def __acquire_download_limit(self, reason: str) -> bool:
         """
-        获取下载器当前的下载限速和上传限速
+        下载器限速，多线程整理时只有第一个线程真正设置限速
 
-        :return: tuple of (download_limit_current_val, upload_limit_current_val)
+        :param reason: 限速原因，仅用于日志
+        :return: 是否持有限速，为True时需调用__release_download_limit恢复
         """
-        for service in self.service_info.values():
-            downloader_name = service.name
-            downloader_obj = service.instance
-            if not downloader_obj:
-                logger.error(f"获取下载器失败 {downloader_name}")
-                continue
-            download_limit_current_val, upload_limit_current_val = (
-                downloader_obj.get_speed_limit()
-            )
+        with speed_limit_lock:
+            self._speed_limit_refs += 1
+            if (
+                self._speed_limit_refs > 1
+                or self._speed_limit_applied
+                or (self._speed_limit_sessions > 0 and self._speed_limit_checked)
+            ):
+                logger.debug(f"下载器已处于限速状态或本次整理无需限速，{reason}")
+                return True
+            self._speed_limit_checked = True
+            self._speed_limit_applied = self.__apply_download_limit(reason)
+            return True
+
+    def __release_download_limit(self):
+        """
+        释放下载器限速，最后一个持有限速的线程负责恢复原速
+        """
+        with speed_limit_lock:
+            self._speed_limit_refs = max(self._speed_limit_refs - 1, 0)
+            if self._speed_limit_refs > 0 or self._speed_limit_sessions > 0:
+                # 还有线程在转移或处于限速会话中，会话结束时统一恢复
+                return
+            self.__restore_download_limit()
 
-        return download_limit_current_val, upload_limit_current_val
+    def __begin_speed_limit_session(self):
+        """
+        开始限速会话，会话期间第一次转移时限速，会话结束后才恢复原速
+        """
+        if self._speed_limit_mode != "session":
+            return False
+        with speed_limit_lock:
+            self._speed_limit_sessions += 1
+        return True
 
-    def moveFailedFilesToPath(self, fail_reason, src):
+    def __end_speed_limit_session(self):
+        """
+        结束限速会话，最后一个会话结束且没有线程在转移时恢复原速
+        """
+        with speed_limit_lock:
+            self._speed_limit_sessions = max(self._speed_limit_sessions - 1, 0)
+            if self._speed_limit_sessions > 0 or self._speed_limit_refs > 0:
+                return
+            self._speed_limit_checked = False
+            self.__restore_download_limit()
+
+    def __apply_download_limit(self, reason: str) -> bool:
         """
-        转移失败的文件到指定的路径
+        对每个下载器限速，限速前先把原速度写入限速日志，插件或容器意外退出后可据此恢复
+        调用方需持有speed_limit_lock
 
-        :param fail_reason: 失败的原因
-        :param src: 需要转移的文件路径
+        :param reason: 限速原因，仅用于日志
+        :return: 是否有下载器被限速
         """
-        is_download_speed_limited = False
+        applied = False
         try:
-            # 先获取当前下载器的限速
-            download_limit_current_val, _ = self.get_downloader_limit_current_val()
-            if (
-                float(download_limit_current_val) > float(self._downloaderSpeedLimit)
-                or float(download_limit_current_val) == 0
-            ):
-                is_download_speed_limited = self.set_download_limit(
-                    self._downloaderSpeedLimit
+            services = self.service_info or {}
+            if not services:
+                logger.info(
+                    f"下载器限速失败，请检查下载器 {', '.join(self._downloaders)} 的连通性，本次整理将跳过下载器限速"
                 )
-                if is_download_speed_limited:
+                return False
+            journal = self.__get_speed_limit_journal()
+            for service in services.values():
+                downloader_name = service.name
+                downloader_obj = service.instance
+                if not downloader_obj:
+                    logger.error(f"获取下载器失败 {downloader_name}")
+                    continue
+                # 先获取当前下载器的限速
+                download_limit_current_val, upload_limit_current_val = (
+                    downloader_obj.get_speed_limit()
+                )
+                if not (
+                    float(download_limit_current_val)
+                    > float(self._downloaderSpeedLimit)
+                    or float(download_limit_current_val) == 0
+                ):
                     logger.info(
-                        f"下载器限速成功设置为 {self._downloaderSpeedLimit} KiB/s"
+                        f"下载器 {downloader_name} 不用设置限速，当前限速为 {download_limit_current_val} KiB/s 大于或等于设定值 {self._downloaderSpeedLimit} KiB/s"
+                    )
+                    continue
+                # 已有未恢复的记录时保留最初的原速度
+                if downloader_name not in journal:
+                    journal[downloader_name] = {
+                        "origin": download_limit_current_val,
+                        "limit": int(self._downloaderSpeedLimit),
+                        "time": time.time(),
+                    }
+                    self.save_data("speed_limit_journal", journal)
+                if downloader_obj.set_speed_limit(
+                    download_limit=int(self._downloaderSpeedLimit),
+                    upload_limit=int(upload_limit_current_val),
+                ):
+                    applied = True
+                    logger.info(
+                        f"下载器 {downloader_name} 限速成功设置为 {self._downloaderSpeedLimit} KiB/s，{reason}"
                     )
                 else:
+                    self.invalidate_service_info()
                     logger.info(
-                        f"下载器限速失败，请检查下载器 {', '.join(self._downloaders)} 的连通性，本次整理将跳过下载器限速"
+                        f"下载器 {downloader_name} 限速失败，请检查连通性，本次整理将跳过该下载器限速"
                     )
-            else:
-                logger.info(
-                    f"不用设置下载器限速，当前下载器限速为 {download_limit_current_val} KiB/s 大于或等于设定值 {self._downloaderSpeedLimit} KiB/s"
-                )
         except Exception as e:
+            self.invalidate_service_info()
             logger.error(
                 f"下载器限速失败，请检查下载器 {', '.join(self._downloaders)} 的连通性，本次整理将跳过下载器限速"
             )
             logger.debug(
                 f"下载器限速失败: {str(e)}, traceback={traceback.format_exc()}"
             )
-            is_download_speed_limited = False
+        return applied
+
+    def __restore_download_limit(self):
+        """
+        恢复限速前的速度，调用方需持有speed_limit_lock
+        """
+        if not self._speed_limit_applied:
+            return
+        self._speed_limit_applied = False
+        self.__reconcile_speed_limit_journal()
+
+    def __get_speed_limit_journal(self) -> Dict[str, dict]:
+        """
+        限速日志 {下载器名称: {"origin": 限速前的下载速度, "limit": 设置的限速, "time": 限速时间}}
+        """
+        return self.get_data("speed_limit_journal") or {}
+
+    def __reconcile_speed_limit_journal(self):
+        """
+        按限速日志恢复各下载器的原速度，恢复成功的记录从日志中删除
+        下载器当前限速已不是插件设置的值时，说明已被手动修改，只删除记录不恢复
+        调用方需持有speed_limit_lock
+        """
+        journal = self.__get_speed_limit_journal()
+        if not journal:
+            return
+        try:
+            services = {
+                service.name: service for service in (self.service_info or {}).values()
+            }
+        except Exception as e:
+            logger.error(f"恢复下载器限速失败，获取下载器失败: {str(e)}")
+            self.invalidate_service_info()
+            return
+        # 有下载器恢复失败时缓存失效，下次重新检查连接
+        failed = False
+        for downloader_name, entry in list(journal.items()):
+            service = services.get(downloader_name)
+            if not service or not service.instance:
+                logger.warn(f"下载器 {downloader_name} 未连接，稍后再恢复限速前的速度")
+                failed = True
+                continue
+            try:
+                download_limit_current_val, upload_limit_current_val = (
+                    service.instance.get_speed_limit()
+                )
+                if float(download_limit_current_val) != float(entry.get("limit")):
+                    logger.info(
+                        f"下载器 {downloader_name} 当前限速 {download_limit_current_val} KiB/s 已被修改，不再恢复"
+                    )
+                elif service.instance.set_speed_limit(
+                    download_limit=int(entry.get("origin")),
+                    upload_limit=int(upload_limit_current_val),
+                ):
+                    logger.info(
+                        f"下载器 {downloader_name} 取消限速成功，已恢复为 {entry.get('origin')} KiB/s"
+                    )
+                else:
+                    logger.error(f"下载器 {downloader_name} 取消限速失败")
+                    failed = True
+                    continue
+                del journal[downloader_name]
+            except Exception as e:
+                logger.error(
+                    f"下载器 {downloader_name} 取消限速失败: {str(e)}, traceback={traceback.format_exc()}"
+                )
+                failed = True
+        self.save_data("speed_limit_journal", journal)
+        if failed:
+            self.invalidate_service_info()
+
+    def __recover_speed_limit(self):
+        """
+        没有进行中的限速时，按限速日志恢复上次意外退出时未恢复的下载器速度
+        """
+        with speed_limit_lock:
+            if (
+                self._speed_limit_applied
+                or self._speed_limit_refs > 0
+                or self._speed_limit_sessions > 0
+            ):
+                return
+            if self.__get_speed_limit_journal():
+                logger.info("发现未恢复的下载器限速记录，正在恢复...")
+                self.__reconcile_speed_limit_journal()
+
+    def moveFailedFilesToPath(self, fail_reason, src):
+        """
+        转移失败的文件到指定的路径，加入队列由后台线程移动
+
+        :param fail_reason: 失败的原因
+        :param src: 需要转移的文件路径
+        """
+        with lock:
+            if self._relocate_queue is None:
+                self._relocate_queue = queue.Queue()
+            if self._relocate_thread is None or not self._relocate_thread.is_alive():
+                self._relocate_stop = threading.Event()
+                self._relocate_thread = threading.Thread(
+                    target=self.__relocate_worker,
+                    args=(self._relocate_queue, self._relocate_stop),
+                    name="autoTransfer-relocate",
+                    daemon=True,
+                )
+                self._relocate_thread.start()
+            self._relocate_queue.put((fail_reason, src))
+        logger.info(f"失败的文件 '{src}' 已加入移动队列")
+
+    def __relocate_worker(self, relocate_queue: queue.Queue, stop: threading.Event):
+        """
+        后台移动失败文件，连续的一批文件只限速一次，队列空闲一段时间后恢复原速，
+        插件停止时不再移动队列中剩余的文件
+        """
+
+        def stopped() -> bool:
+            return stop.is_set() or self._event.is_set()
+
+        stopping = False
+        while not stopping:
+            item = relocate_queue.get()
+            if item is None or stopped():
+                relocate_queue.task_done()
+                break
+            is_download_speed_limited = self.__acquire_download_limit(
+                "正在移动失败文件"
+            )
+            try:
+                while item is not None:
+                    try:
+                        self.__relocate_failed_file(*item)
+                    finally:
+                        relocate_queue.task_done()
+                    if stopped():
+                        stopping = True
+                        break
+                    try:
+                        item = relocate_queue.get(timeout=RELOCATE_BATCH_IDLE)
+                    except queue.Empty:
+                        break
+                    if item is None or stopped():
+                        relocate_queue.task_done()
+                        stopping = True
+                        break
+            finally:
+                # 恢复原速
+                if is_download_speed_limited:
+                    self.__release_download_limit()
+        # 丢弃未移动的文件，它们留在监控目录中，下次整理时重新处理
+        dropped = 0
+        while True:
+            try:
+                item = relocate_queue.get_nowait()
+            except queue.Empty:
+                break
+            relocate_queue.task_done()
+            if item is not None:
+                dropped += 1
+        if dropped:
+            logger.info(f"插件已停止，移动队列中剩余的 {dropped} 个失败文件下次再移动")
+
+    def __wait_relocations(self):
+        """
+        等待队列中的失败文件移动完成
+        """
+        if self._relocate_queue is None or self._relocate_thread is None:
+            return
+        if self._relocate_thread.is_alive():
+            self._relocate_queue.join()
+
+    def __stop_relocate_worker(self):
+        """
+        停止后台线程，等待正在移动的文件一段时间，队列中剩余的文件不再移动
+        """
+        if self._relocate_thread is not None and self._relocate_thread.is_alive():
+            self._relocate_stop.set()
+            self._relocate_queue.put(None)
+            self._relocate_thread.join(timeout=RELOCATE_STOP_TIMEOUT)
+            if self._relocate_thread.is_alive():
+                logger.warn(
+                    f"失败文件移动线程 {RELOCATE_STOP_TIMEOUT} 秒内未结束，当前文件移动完成后自动退出"
+                )
+        self._relocate_thread = None
+        self._relocate_queue = None
+        self._relocate_stop = None
 
+    def __relocate_failed_file(self, fail_reason, src):
+        """
+        移动一个失败文件
+        """
+        new_dst = None
+        if not os.path.exists(src):
+            # 排队期间已被其他流程移走
+            logger.debug(f"失败的文件 '{src}' 已不存在，跳过移动")
+            return
         try:
             logger.info(f"开始转移失败的文件 '{src}'")
             dst = self._pathAfterMoveFailure
@@ -408,86 +1586,820 @@ class autoTransfer(_PluginBase):
                 timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
                 filename, ext = os.path.splitext(new_dst)
                 new_dst = f"{filename}_{timestamp}{ext}"
-            shutil.move(src, new_dst)
+            # 跨文件系统时由fast_copy_file复制并校验大小后再删除源文件
+            shutil.move(src, new_dst, copy_function=fast_copy_file)
             logger.info(f"成功移动转移失败的文件 '{src}' 到 '{new_dst}'")
         except Exception as e:
             logger.error(
                 f"将转移失败的文件 '{src}' 移动到 '{new_dst}' 失败, traceback={traceback.format_exc()}"
             )
 
-        # 恢复原速
-        if is_download_speed_limited:
-            recover_download_limit_success = self.set_download_limit(
-                download_limit_current_val
+    def __start_observer(self, mon_path: str):
+        """
+        启动目录实时监控
+        """
+        try:
+            observer = Observer(timeout=10)
+            observer.schedule(
+                FileMonitorHandler(mon_path=mon_path, sync=self),
+                path=mon_path,
+                recursive=True,
             )
-            if recover_download_limit_success:
-                logger.info("取消下载器限速成功")
+            observer.daemon = True
+            observer.start()
+            self._observers.append(observer)
+            logger.info(f"{mon_path} 的实时监控服务启动")
+        except Exception as e:
+            err_msg = str(e)
+            if "inotify" in err_msg and "reached" in err_msg:
+                logger.warn(
+                    f"实时监控服务启动出现异常：{err_msg}，请在宿主机上（不是docker容器内）执行以下命令并重启："
+                    + """
+                     echo fs.inotify.max_user_watches=524288 | sudo tee -a /etc/sysctl.conf
+                     echo fs.inotify.max_user_instances=524288 | sudo tee -a /etc/sysctl.conf
+                     sudo sysctl -p
+                     """
+                )
             else:
-                logger.error("取消下载器限速失败")
+                logger.error(f"{mon_path} 启动实时监控失败：{err_msg}")
+            self.systemmessage.put(f"{mon_path} 启动实时监控失败：{err_msg}")
+
+    def event_handler(self, mon_path: str, event_path: str):
+        """
+        处理实时监控事件，只记录文件最后变化时间，防抖后再整理
+        :param mon_path: 监控目录
+        :param event_path: 事件文件路径
+        """
+        if Path(event_path).suffix not in settings.RMT_MEDIAEXT:
+            return
+        with lock:
+            self._pending_events[event_path] = (mon_path, time.time(), -1)
+
+    def __flush_pending_events(self):
+        """
+        整理防抖时间内没有变化的实时监控文件
+        """
+        if not self._pending_events:
+            return
+        ready_files = []
+        now = time.time()
+        with lock:
+            for event_path, (mon_path, last_time, last_size) in list(
+                self._pending_events.items()
+            ):
+                if now - last_time < float(self._realtime_delay):
+                    continue
+                try:
+                    file_stat = os.stat(event_path)
+                except OSError:
+                    # 文件已被删除或移走
+                    del self._pending_events[event_path]
+                    continue
+                if file_stat.st_size != last_size:
+                    # 文件仍在写入，继续等待
+                    self._pending_events[event_path] = (
+                        mon_path,
+                        now,
+                        file_stat.st_size,
+                    )
+                    continue
+                del self._pending_events[event_path]
+                ready_files.append((event_path, mon_path, file_stat))
 
-    def main(self):
+        if not ready_files:
+            return
+        unique_items = {}
+        metrics = RunMetrics(trigger="实时监控")
+        with metrics.stage("speed_limit"):
+            in_speed_limit_session = self.__begin_speed_limit_session()
+        try:
+            for idx, (event_path, mon_path, file_stat) in enumerate(
+                ready_files, start=1
+            ):
+                if self._event.is_set():
+                    break
+                if self._size and file_stat.st_size < float(self._size) * 1024**2:
+                    continue
+                metrics.add_seen(mon_path=mon_path)
+                logger.info(
+                    f"实时监控开始处理文件({idx}/{len(ready_files)}) ({file_stat.st_size / 2**30:.2f} GiB): {event_path}"
+                )
+                transfer_result = self.__handle_file(
+                    event_path=event_path,
+                    mon_path=mon_path,
+                    file_stat=file_stat,
+                    metrics=metrics,
+                )
+                if transfer_result is None:
+                    continue
+                transferinfo, mediainfo, file_meta = transfer_result
+                unique_key = Path(transferinfo.target_diritem.path)
+                if unique_key not in unique_items:
+                    unique_items[unique_key] = (transferinfo, mediainfo, file_meta)
+        finally:
+            if in_speed_limit_session:
+                with metrics.stage("speed_limit"):
+                    self.__end_speed_limit_session()
+
+        # 移动模式删除空目录
+        with metrics.stage("del_empty_dirs"):
+            for mon_path in {mon_path for _, mon_path, _ in ready_files}:
+                self.__del_empty_dirs(mon_path)
+
+        # 刮削
+        if self._scrape:
+            for item in unique_items.values():
+                self.__scrape(*item, metrics=metrics)
+
+        metrics.finish()
+        self._metrics_history.append(metrics)
+        logger.info(f"实时监控整理完成！{metrics.summary()}")
+
+    def main(self, full_scan: bool = False):
         """
         立即运行一次
+        :param full_scan: 是否忽略文件状态索引，重新处理所有文件
         """
+        in_speed_limit_session = False
+        scrape_executor = None
+        metrics = RunMetrics(trigger="全量扫描" if full_scan else "定时任务")
+        self._current_metrics = metrics
         try:
             logger.info(f"插件{self.plugin_name} v{self.plugin_version} 开始运行")
-            # 执行前先取消下载器限速
-            if self._pre_cancel_speed_limit:
-                logger.info("【预取消限速】正在取消下载器限速...")
-                if self.set_download_limit(0):
-                    logger.info("下载器限速已取消")
-                else:
-                    logger.error("下载器限速取消失败")
-
-            # 遍历所有目录
-            for idx, mon_path in enumerate(self._dirconf.keys(), start=1):
-                logger.info(f"开始处理目录({idx}/{len(self._dirconf)}): {mon_path} ...")
-                list_files = SystemUtils.list_files(
-                    directory=Path(mon_path),
-                    extensions=settings.RMT_MEDIAEXT,
-                    min_filesize=int(self._size),
-                    recursive=True,
+            # 恢复上次意外退出时未恢复的下载器限速
+            self.__recover_speed_limit()
+
+            # 整理期间只限速一次
+            with metrics.stage("speed_limit"):
+                in_speed_limit_session = self.__begin_speed_limit_session()
+
+            # 加载文件状态索引
+            self._file_index = None
+            if self._incremental_scan:
+                self._file_index = FileStateIndex(
+                    data=self.get_data("file_state_index"),
+                    fingerprint=self.__get_filter_fingerprint(),
+                )
+                logger.info(
+                    f"已加载文件状态索引，共 {len(self._file_index)} 条记录"
+                    + ("，本次为全量扫描" if full_scan else "")
                 )
-                logger.info(f"源目录 {mon_path} 共发现 {len(list_files)} 个视频")
-                unique_items = {}
 
-                # 遍历目录下所有文件
-                for idx, file_path in enumerate(list_files, start=1):
-                    logger.info(
-                        f"开始处理文件({idx}/{len(list_files)}) ({file_path.stat().st_size / 2**30:.2f} GiB): {file_path}"
-                    )
+            # 集信息缓存，本次运行内所有监控目录共用
+            self._episodes_cache = MemoCache(maxsize=1024, ttl=86400)
 
-                    transfer_result = self.__handle_file(
-                        event_path=str(file_path), mon_path=mon_path
+            max_workers = self.__get_max_workers()
+            logger.info(f"整理线程数: {max_workers}")
+            # 刮削与整理并行，单独的线程池
+            if self._scrape:
+                scrape_executor = ThreadPoolExecutor(
+                    max_workers=self.__get_scrape_workers(),
+                    thread_name_prefix="autoTransfer-scrape",
+                )
+
+            # 按目录或磁盘分为多条通道并行处理，通道内按顺序处理
+            lanes = self.__get_dir_lanes()
+            if len(lanes) > 1:
+                logger.info(f"监控目录分为 {len(lanes)} 条通道并行处理")
+            with ThreadPoolExecutor(
+                max_workers=max(len(lanes), 1), thread_name_prefix="autoTransfer-lane"
+            ) as lane_executor:
+                for lane in lanes:
+                    lane_executor.submit(
+                        self.__process_lane,
+                        lane=lane,
+                        full_scan=full_scan,
+                        max_workers=max_workers,
+                        scrape_executor=scrape_executor,
+                        metrics=metrics,
                     )
-                    # 如果返回值是 None，则跳过
-                    if transfer_result is None:
-                        logger.debug(
-                            f"处理文件 {file_path} 时，__handle_file 返回了 None，只要不是整理成功都是返回None，跳过刮削"
-                        )
-                        continue
 
+            # 等待刮削完成
+            if scrape_executor:
+                scrape_executor.shutdown(wait=True)
+                scrape_executor = None
+
+            # 等待失败文件移动完成，与本次整理共用一次限速
+            self.__wait_relocations()
+
+            metrics.finish()
+            logger.info(f"目录内所有文件整理完成！{metrics.summary()}")
+            if self._recognize_cache is not None:
+                logger.info(f"媒体识别缓存{self._recognize_cache.stats()}")
+                metrics.caches["recognize"] = self._recognize_cache.to_dict()
+            logger.info(f"集信息缓存{self._episodes_cache.stats()}")
+            metrics.caches["tmdb_episodes"] = self._episodes_cache.to_dict()
+        except Exception as e:
+            logger.error(
+                f"插件{self.plugin_name} V{self.plugin_version} 运行失败，错误信息:{e}，traceback={traceback.format_exc()}"
+            )
+        finally:
+            if scrape_executor:
+                scrape_executor.shutdown(wait=True)
+            self._episodes_cache = None
+            self.__save_file_index()
+            if in_speed_limit_session:
+                with metrics.stage("speed_limit"):
+                    self.__end_speed_limit_session()
+            metrics.finish()
+            self._current_metrics = None
+            self._metrics_history.append(metrics)
+
+    def __save_file_index(self):
+        """
+        文件状态索引有变化时保存，一次运行只保存一次
+        """
+        if self._file_index is None or not self._file_index.dirty:
+            return
+        try:
+            self.save_data("file_state_index", self._file_index.to_dict())
+            logger.info(f"已保存文件状态索引，共 {len(self._file_index)} 条记录")
+        except Exception as e:
+            logger.error(f"保存文件状态索引失败: {str(e)}")
+
+    def __process_lane(
+        self,
+        lane: List[Tuple[int, str]],
+        full_scan: bool,
+        max_workers: int,
+        scrape_executor: Optional[ThreadPoolExecutor],
+        metrics: RunMetrics,
+    ):
+        """
+        按顺序处理一条通道内的监控目录
+        """
+        for idx, mon_path in lane:
+            try:
+                self.__process_monitor_dir(
+                    idx=idx,
+                    mon_path=mon_path,
+                    full_scan=full_scan,
+                    max_workers=max_workers,
+                    scrape_executor=scrape_executor,
+                    metrics=metrics,
+                )
+            except Exception as e:
+                logger.error(
+                    f"处理目录 {mon_path} 失败: {str(e)}, traceback={traceback.format_exc()}"
+                )
+
+    def __process_monitor_dir(
+        self,
+        idx: int,
+        mon_path: str,
+        full_scan: bool,
+        max_workers: int,
+        scrape_executor: Optional[ThreadPoolExecutor],
+        metrics: RunMetrics,
+    ):
+        """
+        处理一个监控目录
+        """
+        if self._event.is_set():
+            logger.info(f"插件已停止，跳过目录 {mon_path}")
+            return
+        logger.info(f"开始处理目录({idx}/{len(self._dirconf)}): {mon_path} ...")
+        metrics.begin_dir(mon_path)
+
+        found_count = 0
+        pending_count = 0
+        # 按源文件所在目录分组，一组文件全部处理完即可刮削，不必等整个监控目录
+        # 遍历时同一目录的文件是连续的，出现其他目录的文件即说明该组已全部提交
+        group_remaining: Dict[Path, int] = {}
+        group_items: Dict[Path, dict] = {}
+        closed_groups = set()
+        current_group = None
+        # 同时提交的文件数上限，边遍历边整理，内存占用与目录大小无关
+        max_inflight = max_workers * 2
+        inflight = {}
+
+        def finish_group(group: Path):
+            """
+            一组文件都处理完了，开始刮削
+            """
+            closed_groups.discard(group)
+            group_remaining.pop(group, None)
+            unique_items = group_items.pop(group, {})
+            if scrape_executor:
+                for item in unique_items.values():
+                    # 其他分组或通道已提交同一目的目录且还未开始刮削时，不重复提交
+                    if self.__schedule_scrape(item[0].target_diritem.path):
+                        scrape_executor.submit(self.__scrape, *item, metrics=metrics)
+
+        def handle_done(done_futures):
+            for future in done_futures:
+                file_path = inflight.pop(future)
+                transfer_result = future.result()
+                group = file_path.parent
+                group_remaining[group] -= 1
+                # 如果返回值是 None，则跳过
+                if transfer_result is None:
+                    logger.debug(
+                        f"处理文件 {file_path} 时，__handle_file 返回了 None，只要不是整理成功都是返回None，跳过刮削"
+                    )
+                else:
                     transferinfo, mediainfo, file_meta = transfer_result
                     unique_key = Path(transferinfo.target_diritem.path)
 
                     # 存储不重复的项
+                    unique_items = group_items.setdefault(group, {})
                     if unique_key not in unique_items:
-                        unique_items[unique_key] = (transferinfo, mediainfo, file_meta)
-
-                # 刮削
-                if self._scrape:
-                    for transferinfo, mediainfo, file_meta in unique_items.values():
-                        self.mediaChain.scrape_metadata(
-                            fileitem=transferinfo.target_diritem,
-                            meta=file_meta,
-                            mediainfo=mediainfo,
+                        unique_items[unique_key] = (
+                            transferinfo,
+                            mediainfo,
+                            file_meta,
                         )
+                if group_remaining[group] == 0 and group in closed_groups:
+                    finish_group(group)
+
+        # 边遍历边整理，多线程整理
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="autoTransfer"
+        ) as executor:
+            # 遍历时每个文件只stat一次，大小、修改时间、inode随文件一起传递
+            for file_path, file_stat in self.__scan_media_files(
+                directory=Path(mon_path), min_filesize=int(self._size)
+            ):
+                if self._event.is_set():
+                    break
+                found_count += 1
+                metrics.add_seen(mon_path=mon_path)
+                if self._file_index is not None:
+                    # 全量扫描时也查询，标记扫描到了该文件
+                    status = self._file_index.lookup(str(file_path), file_stat)
+                    # 跳过未变化且已有处理结果的文件
+                    if status and not full_scan:
+                        logger.debug(f"{file_path} 未变化，上次处理结果: {status}")
+                        metrics.skip("unchanged")
+                        continue
+
+                # 批量预取历史记录
+                if pending_count == 0:
+                    with metrics.stage("prefetch_history"):
+                        self.__prefetch_history(mon_path)
+                pending_count += 1
+
+                group = file_path.parent
+                if group != current_group:
+                    if current_group is not None:
+                        closed_groups.add(current_group)
+                        if group_remaining.get(current_group) == 0:
+                            finish_group(current_group)
+                    current_group = group
+                group_remaining[group] = group_remaining.get(group, 0) + 1
+
+                future = executor.submit(
+                    self.__process_file,
+                    idx=pending_count,
+                    total=None,
+                    file_path=file_path,
+                    file_stat=file_stat,
+                    mon_path=mon_path,
+                    metrics=metrics,
+                )
+                inflight[future] = file_path
+                if len(inflight) >= max_inflight:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    handle_done(done)
+                metrics.set_queued(mon_path, len(inflight))
+
+            if current_group is not None:
+                closed_groups.add(current_group)
+                if group_remaining.get(current_group) == 0:
+                    finish_group(current_group)
+            while inflight:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                handle_done(done)
+                metrics.set_queued(mon_path, len(inflight))
+
+        logger.info(
+            f"源目录 {mon_path} 共发现 {found_count} 个视频"
+            + (
+                f"，增量扫描跳过 {found_count - pending_count} 个未变化的文件"
+                if found_count > pending_count
+                else ""
+            )
+        )
+
+        self._history_prefetch.pop(mon_path, None)
+
+        # 移动模式删除空目录
+        with metrics.stage("del_empty_dirs"):
+            self.__del_empty_dirs(mon_path)
+        metrics.end_dir(mon_path)
+
+        # 清理已不存在的文件记录，所有目录处理完后统一保存
+        # 中途停止时遍历不完整，不清理未遍历到的记录
+        if self._file_index is not None and not self._event.is_set():
+            self._file_index.prune(mon_path)
+
+    @staticmethod
+    def __scan_media_files(directory: Path, min_filesize: int = 0):
+        """
+        递归遍历目录下的媒体文件，与SystemUtils.list_files的过滤规则一致，但每个文件只stat一次
+        :param directory: 目录
+        :param min_filesize: 最小文件大小，单位MiB
+        :return: 生成(文件路径, 文件状态)
+        """
+        if not directory.exists():
+            return
+        extensions = tuple(ext.lower() for ext in settings.RMT_MEDIAEXT)
+        min_size = (min_filesize or 0) * 1024 * 1024
+        if directory.is_file():
+            yield directory, directory.stat()
+            return
+        pending_dirs = [directory]
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                logger.debug(f"遍历目录 {current_dir} 失败: {str(e)}")
+                continue
+            sub_dirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_dirs.append(Path(entry.path))
+                    elif entry.name.lower().endswith(extensions) and entry.is_file():
+                        file_stat = entry.stat()
+                        if file_stat.st_size >= min_size:
+                            yield Path(entry.path), file_stat
+                except OSError as e:
+                    logger.debug(f"读取文件 {entry.path} 失败: {str(e)}")
+            # 逆序入栈，按名称顺序深度优先遍历
+            pending_dirs.extend(reversed(sub_dirs))
+
+    def __get_dir_lanes(self) -> List[List[Tuple[int, str]]]:
+        """
+        将监控目录分为多条通道，通道之间并行处理，通道内按顺序处理
+        dir: 每个监控目录一条通道；device: 同一磁盘(st_dev)上的监控目录一条通道；否则只有一条通道
+        """
+        mon_paths = list(enumerate(self._dirconf.keys(), start=1))
+        if self._parallel_dirs == "dir":
+            return [[item] for item in mon_paths]
+        if self._parallel_dirs == "device":
+            lanes: Dict[Any, List[Tuple[int, str]]] = {}
+            for idx, mon_path in mon_paths:
+                try:
+                    device = os.stat(mon_path).st_dev
+                except OSError:
+                    device = mon_path
+                lanes.setdefault(device, []).append((idx, mon_path))
+            return list(lanes.values())
+        return [mon_paths] if mon_paths else []
+
+    def __get_scrape_workers(self) -> int:
+        """
+        获取刮削线程数
+        """
+        try:
+            return max(int(self._scrape_workers), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def __schedule_scrape(self, target_path: str) -> bool:
+        """
+        登记待刮削的目的目录
+        :return: 同一目录已在排队等待刮削时返回False
+        """
+        with self._scrape_lock:
+            if target_path in self._scrape_pending:
+                return False
+            self._scrape_pending.add(target_path)
+            return True
+
+    def __scrape(
+        self,
+        transferinfo: TransferInfo,
+        mediainfo: MediaInfo,
+        file_meta,
+        metrics: Optional[RunMetrics] = None,
+    ):
+        """
+        刮削整理后的目录，同一目的目录的刮削不会同时进行
+        """
+        target_path = transferinfo.target_diritem.path
+        with self._scrape_lock:
+            # 开始刮削后再有文件整理到该目录，允许重新排队
+            self._scrape_pending.discard(target_path)
+            dir_lock = self._scrape_dir_locks.setdefault(
+                target_path, [threading.Lock(), 0]
+            )
+            dir_lock[1] += 1
+        try:
+            with dir_lock[0], (metrics or RunMetrics()).stage("scrape"):
+                self.mediaChain.scrape_metadata(
+                    fileitem=transferinfo.target_diritem,
+                    meta=file_meta,
+                    mediainfo=mediainfo,
+                )
+        except Exception as e:
+            logger.error(
+                f"刮削 {transferinfo.target_diritem.path} 失败: {str(e)}, traceback={traceback.format_exc()}"
+            )
+        finally:
+            with self._scrape_lock:
+                dir_lock[1] -= 1
+                if dir_lock[1] == 0:
+                    self._scrape_dir_locks.pop(target_path, None)
+
+    def __get_max_workers(self) -> int:
+        """
+        获取整理线程数，配置为0时按目的目录所在设备数分配，每个设备一个线程
+        """
+        try:
+            max_workers = int(self._max_workers)
+        except (TypeError, ValueError):
+            max_workers = 1
+        if max_workers > 0:
+            return max_workers
+        devices = set()
+        for target_path in self._dirconf.values():
+            try:
+                if target_path and target_path.exists():
+                    devices.add(target_path.stat().st_dev)
+            except OSError as e:
+                logger.debug(f"获取目的目录 {target_path} 所在设备失败: {str(e)}")
+        return max(len(devices), 1)
 
-            logger.info("目录内所有文件整理完成！")
+    def __prefetch_history(self, mon_path: str):
+        """
+        一次性查询监控目录下的整理记录和下载记录，避免逐个文件查询数据库
+        :param mon_path: 监控目录
+        """
+        db = ScopedSession()
+        try:
+            transferred_srcs = {
+                src
+                for (src,) in db.query(TransferHistory.src).filter(
+                    TransferHistory.src.startswith(mon_path)
+                )
+            }
+            download_paths = {}
+            # 按id升序，同一路径保留第一条下载记录，与get_by_path的first()一致
+            for path, tmdbid, mtype in (
+                db.query(
+                    DownloadHistory.path, DownloadHistory.tmdbid, DownloadHistory.type
+                )
+                .filter(DownloadHistory.path.startswith(mon_path))
+                .order_by(DownloadHistory.id)
+            ):
+                download_paths.setdefault(path, (tmdbid, mtype))
         except Exception as e:
             logger.error(
-                f"插件{self.plugin_name} V{self.plugin_version} 运行失败，错误信息:{e}，traceback={traceback.format_exc()}"
+                f"批量查询 {mon_path} 的历史记录失败，将逐个文件查询: {str(e)}, traceback={traceback.format_exc()}"
             )
+            self._history_prefetch.pop(mon_path, None)
+            return
+        finally:
+            db.close()
+        with lock:
+            self._history_prefetch[mon_path] = (transferred_srcs, download_paths)
+        logger.info(
+            f"已预取 {mon_path} 的 {len(transferred_srcs)} 条整理记录和 {len(download_paths)} 条下载记录"
+        )
+
+    def __is_transferred(self, mon_path: str, src: str) -> bool:
+        """
+        查询源文件是否整理过，优先使用预取的整理记录
+        """
+        prefetch = self._history_prefetch.get(mon_path)
+        if prefetch is not None:
+            return src in prefetch[0]
+        return bool(self.transferhis.get_by_src(src))
+
+    def __mark_transferred(self, mon_path: str, src: str):
+        """
+        新增整理记录后同步更新预取的整理记录
+        """
+        prefetch = self._history_prefetch.get(mon_path)
+        if prefetch is not None:
+            with lock:
+                prefetch[0].add(src)
+
+    def __get_download_history(self, mon_path: str, path: str):
+        """
+        按路径查询下载记录，优先使用预取的下载记录
+        """
+        prefetch = self._history_prefetch.get(mon_path)
+        if prefetch is None:
+            return self.downloadhis.get_by_path(path)
+        if path not in prefetch[1]:
+            return None
+        tmdbid, mtype = prefetch[1][path]
+        # 每次返回新对象，__update_file_meta 会修改type
+        return SimpleNamespace(tmdbid=tmdbid, type=mtype)
+
+    def __recognize_media(self, file_meta: MetaBase) -> Optional[MediaInfo]:
+        """
+        识别媒体信息，按决定识别结果的字段缓存，同一季的剧集只识别一次
+        """
+        if self._recognize_cache is None:
+            return self.chain.recognize_media(meta=file_meta)
+        cache_key = (
+            file_meta.name,
+            file_meta.year,
+            file_meta.type,
+            file_meta.begin_season,
+            file_meta.tmdbid,
+        )
+        mediainfo = self._recognize_cache.get_or_load(
+            cache_key, lambda: self.chain.recognize_media(meta=file_meta)
+        )
+        # 返回副本，后续流程会修改mediainfo
+        return copy.deepcopy(mediainfo) if mediainfo else None
+
+    def __get_tmdb_episodes(self, tmdbid: int, season: int) -> List[TmdbEpisode]:
+        """
+        获取集信息，同一季在一次运行中只查询一次，可选持久化缓存一段时间
+        """
+        if self._episodes_cache is None:
+            return self.__load_tmdb_episodes(tmdbid=tmdbid, season=season)
+        return self._episodes_cache.get_or_load(
+            (tmdbid, season),
+            lambda: self.__load_tmdb_episodes(tmdbid=tmdbid, season=season),
+        )
+
+    def __load_tmdb_episodes(self, tmdbid: int, season: int) -> List[TmdbEpisode]:
+        """
+        从持久化缓存或TMDB获取集信息
+        """
+        try:
+            ttl = float(self._episodes_cache_ttl) * 60
+        except (TypeError, ValueError):
+            ttl = 0
+        if ttl <= 0:
+            return self.tmdbchain.tmdb_episodes(tmdbid=tmdbid, season=season)
+
+        cache_key = f"{tmdbid}|{season}"
+        cached = (self.get_data("tmdb_episodes") or {}).get(cache_key)
+        if cached and time.time() - cached.get("time", 0) < ttl:
+            return [TmdbEpisode(**episode) for episode in cached.get("episodes")]
+
+        episodes = self.tmdbchain.tmdb_episodes(tmdbid=tmdbid, season=season)
+        if episodes:
+            with lock:
+                now = time.time()
+                data = {
+                    key: value
+                    for key, value in (self.get_data("tmdb_episodes") or {}).items()
+                    if now - value.get("time", 0) < ttl
+                }
+                data[cache_key] = {
+                    "time": now,
+                    "episodes": [episode.dict() for episode in episodes],
+                }
+                self.save_data("tmdb_episodes", data)
+        return episodes
+
+    def __get_transfer_exclude_matcher(self) -> KeywordMatcher:
+        """
+        获取整理屏蔽词匹配器，系统配置中的整理屏蔽词变化后才重新编译
+        """
+        transfer_exclude_words = (
+            self.systemconfig.get(SystemConfigKey.TransferExcludeWords) or []
+        )
+        matcher = self._transfer_exclude_matcher
+        if matcher is None or matcher.keywords != [
+            keyword for keyword in transfer_exclude_words if keyword
+        ]:
+            matcher = KeywordMatcher(transfer_exclude_words, flags=re.IGNORECASE)
+            self._transfer_exclude_matcher = matcher
+        return matcher
+
+    def __del_empty_dirs(self, mon_path: str):
+        """
+        自底向上删除监控目录下不再包含媒体文件的目录，每个目录只扫描一次
+        :param mon_path: 监控目录
+        """
+        with lock:
+            touched_dirs = self._touched_dirs.pop(mon_path, set())
+        if not touched_dirs:
+            return
+
+        # 有文件被移走的目录及其上级目录，删除到监控目录为止
+        mon_path_len = len(str(Path(mon_path)))
+        candidates = set()
+        for touched_dir in touched_dirs:
+            for file_dir in [touched_dir, *touched_dir.parents]:
+                if len(str(file_dir)) <= mon_path_len:
+                    # 重要，删除到监控目录为止
+                    break
+                candidates.add(file_dir)
+
+        extensions = {
+            ext.lower() for ext in settings.RMT_MEDIAEXT + settings.DOWNLOAD_TMPEXT
+        }
+        # 目录下(含子目录)是否还有媒体文件
+        has_media: Dict[Path, bool] = {}
+        for file_dir in sorted(candidates, key=lambda d: len(d.parts), reverse=True):
+            try:
+                found = False
+                with os.scandir(file_dir) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            child = Path(entry.path)
+                            if child in has_media:
+                                found = has_media[child]
+                            else:
+                                found = self.__dir_has_media(child, extensions)
+                        else:
+                            found = Path(entry.name).suffix.lower() in extensions
+                        if found:
+                            break
+            except FileNotFoundError:
+                has_media[file_dir] = False
+                continue
+            except OSError as e:
+                logger.debug(f"扫描目录 {file_dir} 失败: {str(e)}")
+                found = True
+            has_media[file_dir] = found
+            if not found:
+                logger.warn(f"移动模式，删除空目录: {file_dir}")
+                shutil.rmtree(file_dir, ignore_errors=True)
+
+    @staticmethod
+    def __dir_has_media(directory: Path, extensions: set) -> bool:
+        """
+        目录下(含子目录)是否有媒体文件，找到第一个即返回
+        """
+        for _, _, files in os.walk(directory):
+            for file in files:
+                if Path(file).suffix.lower() in extensions:
+                    return True
+        return False
+
+    def __get_filter_fingerprint(self) -> str:
+        """
+        过滤配置指纹，过滤关键字、整理屏蔽词或最小文件大小变化后，排除类的索引记录失效
+        """
+        transfer_exclude_words = (
+            self.systemconfig.get(SystemConfigKey.TransferExcludeWords) or []
+        )
+        return "|".join(
+            [
+                self._exclude_keywords or "",
+                "\n".join(transfer_exclude_words),
+                str(self._size),
+                ",".join(settings.RMT_MEDIAEXT),
+            ]
+        )
+
+    def __process_file(
+        self,
+        idx: int,
+        total: Optional[int],
+        file_path: Path,
+        file_stat: os.stat_result,
+        mon_path: str,
+        metrics: RunMetrics,
+    ):
+        """
+        线程池中整理单个文件
+        """
+        if self._event.is_set():
+            return None
+        logger.info(
+            f"开始处理文件({idx}{f'/{total}' if total else ''}) ({file_stat.st_size / 2**30:.2f} GiB): {file_path}"
+        )
+        return self.__handle_file(
+            event_path=str(file_path),
+            mon_path=mon_path,
+            file_stat=file_stat,
+            metrics=metrics,
+        )
+
+    def __record_failure(
+        self,
+        metrics: RunMetrics,
+        mon_path: str,
+        event_path: str,
+        reason: str,
+        message: Optional[str] = None,
+    ):
+        """
+        记录整理失败的文件，用于统计和详情页展示
+        """
+        metrics.fail(reason, mon_path=mon_path)
+        self._recent_failures.append(
+            {
+                "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "path": event_path,
+                "reason": METRIC_LABELS.get(reason, reason)
+                + (f": {message}" if message else ""),
+            }
+        )
+
+    def __record_file_state(
+        self, event_path: str, file_stat: Optional[os.stat_result], status: str
+    ):
+        """
+        记录文件处理结果到文件状态索引
+        """
+        if self._file_index is not None:
+            self._file_index.record(event_path, file_stat, status)
 
     def __update_file_meta(
         self, file_path: str, file_meta: Dict, get_by_path_result
@@ -519,329 +2431,386 @@ class autoTransfer(_PluginBase):
         )
         return file_meta
 
-    def __handle_file(self, event_path: str, mon_path: str):
+    def __handle_file(
+        self,
+        event_path: str,
+        mon_path: str,
+        file_stat: Optional[os.stat_result] = None,
+        metrics: Optional[RunMetrics] = None,
+    ):
+        """
+        同步一个文件，同一个文件(或蓝光目录)同一时间只允许一个线程处理
+        :param event_path: 事件文件路径
+        :param mon_path: 监控目录
+        :param file_stat: 文件状态，用于记录文件状态索引
+        :param metrics: 运行统计
+        """
+        if metrics is None:
+            metrics = RunMetrics()
+        processing_key = event_path
+        if re.search(r"BDMV[/\\]STREAM", event_path, re.IGNORECASE):
+            processing_key = event_path[: event_path.find("BDMV")]
+        with lock:
+            if processing_key in self._processing:
+                logger.info(f"{processing_key} 正在被其他线程整理，跳过")
+                metrics.skip("busy")
+                return
+            self._processing.add(processing_key)
+        try:
+            return self.__transfer_file(
+                event_path=event_path,
+                mon_path=mon_path,
+                file_stat=file_stat,
+                metrics=metrics,
+            )
+        finally:
+            with lock:
+                self._processing.discard(processing_key)
+
+    def __transfer_file(
+        self,
+        event_path: str,
+        mon_path: str,
+        file_stat: Optional[os.stat_result],
+        metrics: RunMetrics,
+    ):
         """
         同步一个文件
         :param event_path: 事件文件路径
         :param mon_path: 监控目录
+        :param file_stat: 文件状态，用于记录文件状态索引
+        :param metrics: 运行统计
         """
         file_path = Path(event_path)
         try:
-            if not file_path.exists():
+            # 遍历时已取得文件状态的不再检查是否存在
+            if file_stat is None and not file_path.exists():
+                return
+            if self.__is_transferred(mon_path, event_path):
+                logger.info(f"文件已处理过: {event_path}")
+                metrics.skip("transferred")
+                self.__record_file_state(
+                    event_path, file_stat, FileStateIndex.TRANSFERRED
+                )
                 return
-            # 全程加锁
-            with lock:
-                transfer_history = self.transferhis.get_by_src(event_path)
-                if transfer_history:
-                    logger.info(f"文件已处理过: {event_path}")
-                    return
 
-                # 回收站及隐藏的文件不处理
+            # 回收站及隐藏的文件不处理
+            if (
+                event_path.find("/@Recycle/") != -1
+                or event_path.find("/#recycle/") != -1
+                or event_path.find("/.") != -1
+                or event_path.find("/@eaDir") != -1
+            ):
+                logger.debug(f"{event_path} 是回收站或隐藏的文件")
+                metrics.skip("hidden")
+                self.__record_file_state(event_path, file_stat, FileStateIndex.EXCLUDED)
+                return
+
+            # 命中过滤关键字不处理
+            keyword = self._exclude_matcher.match(event_path)
+            if keyword:
+                logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
+                metrics.skip("exclude_keyword")
                 if (
-                    event_path.find("/@Recycle/") != -1
-                    or event_path.find("/#recycle/") != -1
-                    or event_path.find("/.") != -1
-                    or event_path.find("/@eaDir") != -1
+                    self._pathAfterMoveFailure is not None
+                    and self._transfer_type == "move"
+                    and self._move_excluded_files
                 ):
-                    logger.debug(f"{event_path} 是回收站或隐藏的文件")
-                    return
+                    # 移动失败或插件停止未移动时文件留在原处，不记录索引，下次扫描重新处理
+                    self.moveFailedFilesToPath("命中过滤关键字", str(file_path))
+                else:
+                    self.__record_file_state(
+                        event_path, file_stat, FileStateIndex.EXCLUDED
+                    )
+                return
 
-                # 命中过滤关键字不处理
-                if self._exclude_keywords:
-                    for keyword in self._exclude_keywords.split("\n"):
-                        if keyword and re.findall(keyword, event_path):
-                            logger.info(
-                                f"{event_path} 命中过滤关键字 {keyword}，不处理"
-                            )
-                            if (
-                                self._pathAfterMoveFailure is not None
-                                and self._transfer_type == "move"
-                                and self._move_excluded_files
-                            ):
-                                self.moveFailedFilesToPath(
-                                    "命中过滤关键字", str(file_path)
-                                )
-                            return
-
-                # 整理屏蔽词不处理
-                transfer_exclude_words = self.systemconfig.get(
-                    SystemConfigKey.TransferExcludeWords
+            # 整理屏蔽词不处理
+            keyword = self.__get_transfer_exclude_matcher().match(event_path)
+            if keyword:
+                logger.info(f"{event_path} 命中整理屏蔽词 {keyword}，不处理")
+                metrics.skip("transfer_exclude")
+                if (
+                    self._pathAfterMoveFailure is not None
+                    and self._transfer_type == "move"
+                    and self._move_excluded_files
+                ):
+                    # 移动失败或插件停止未移动时文件留在原处，不记录索引，下次扫描重新处理
+                    self.moveFailedFilesToPath("命中整理屏蔽词", str(file_path))
+                else:
+                    self.__record_file_state(
+                        event_path, file_stat, FileStateIndex.EXCLUDED
+                    )
+                return
+
+            # 不是媒体文件不处理
+            if file_path.suffix not in settings.RMT_MEDIAEXT:
+                logger.debug(f"{event_path} 不是媒体文件")
+                metrics.skip("not_media")
+                self.__record_file_state(event_path, file_stat, FileStateIndex.EXCLUDED)
+                return
+
+            # 判断是不是蓝光目录
+            if re.search(r"BDMV[/\\]STREAM", event_path, re.IGNORECASE):
+                # 截取BDMV前面的路径
+                blurray_dir = event_path[: event_path.find("BDMV")]
+                file_path = Path(blurray_dir)
+                logger.info(
+                    f"{event_path} 是蓝光目录，更正文件路径为: {str(file_path)}"
                 )
-                if transfer_exclude_words:
-                    for keyword in transfer_exclude_words:
-                        if not keyword:
-                            continue
-                        if keyword and re.search(
-                            f"{keyword}", event_path, re.IGNORECASE
-                        ):
-                            logger.info(
-                                f"{event_path} 命中整理屏蔽词 {keyword}，不处理"
-                            )
-                            if (
-                                self._pathAfterMoveFailure is not None
-                                and self._transfer_type == "move"
-                                and self._move_excluded_files
-                            ):
-                                self.moveFailedFilesToPath(
-                                    "命中整理屏蔽词", str(file_path)
-                                )
-                            return
-
-                # 不是媒体文件不处理
-                if file_path.suffix not in settings.RMT_MEDIAEXT:
-                    logger.debug(f"{event_path} 不是媒体文件")
+                # 同一蓝光目录的其他文件已随整个目录移走
+                if not file_path.exists():
+                    logger.debug(f"蓝光目录 {file_path} 已不存在，跳过")
                     return
-
-                # 判断是不是蓝光目录
-                if re.search(r"BDMV[/\\]STREAM", event_path, re.IGNORECASE):
-                    # 截取BDMV前面的路径
-                    blurray_dir = event_path[: event_path.find("BDMV")]
-                    file_path = Path(blurray_dir)
-                    logger.info(
-                        f"{event_path} 是蓝光目录，更正文件路径为: {str(file_path)}"
+                # 查询历史记录，已转移的不处理
+                if self.__is_transferred(mon_path, str(file_path)):
+                    logger.info(f"{file_path} 已整理过")
+                    metrics.skip("transferred")
+                    self.__record_file_state(
+                        event_path, file_stat, FileStateIndex.TRANSFERRED
                     )
-                    # 查询历史记录，已转移的不处理
-                    if self.transferhis.get_by_src(str(file_path)):
-                        logger.info(f"{file_path} 已整理过")
-                        return
-
-                # 元数据
-                file_meta = MetaInfoPath(file_path)
-                if not file_meta.name:
-                    logger.error(f"{file_path.name} 无法识别有效信息")
                     return
 
-                # 通过文件路径从历史下载记录中获取tmdbid和type
-                # 先通过文件路径来查
-                get_by_path_result = self.downloadhis.get_by_path(str(file_path))
-                if get_by_path_result is not None:
-                    logger.info(
-                        f"通过文件路径 {str(file_path)} 从历史下载记录中获取到tmdbid={get_by_path_result.tmdbid}，type={get_by_path_result.type}"
-                    )
-                    file_meta = self.__update_file_meta(
-                        file_path=str(file_path),
-                        file_meta=file_meta,
-                        get_by_path_result=get_by_path_result,
-                    )
-                else:
-                    # 不行再通过文件父目录来查
-                    if str(file_path.parent) != mon_path:
-                        parent_path = str(file_path.parent)
-                        get_by_path_result = None
-
-                        # 尝试获取get_by_path_result，最多parent 3次
-                        for _ in range(3):
-                            # 如果父路径已经是mon_path了，就没意义了
-                            if parent_path == mon_path:
-                                break
-
-                            get_by_path_result = self.downloadhis.get_by_path(
-                                parent_path
-                            )
-                            if get_by_path_result:
-                                break  # 找到结果，跳出循环
+            # 元数据
+            file_meta = MetaInfoPath(file_path)
+            if not file_meta.name:
+                logger.error(f"{file_path.name} 无法识别有效信息")
+                metrics.skip("unrecognized")
+                self.__record_file_state(
+                    event_path, file_stat, FileStateIndex.UNRECOGNIZED
+                )
+                return
 
-                            parent_path = str(
-                                Path(parent_path).parent
-                            )  # 获取父目录路径
+            # 通过文件路径从历史下载记录中获取tmdbid和type
+            # 先通过文件路径来查
+            get_by_path_result = self.__get_download_history(mon_path, str(file_path))
+            if get_by_path_result is not None:
+                logger.info(
+                    f"通过文件路径 {str(file_path)} 从历史下载记录中获取到tmdbid={get_by_path_result.tmdbid}，type={get_by_path_result.type}"
+                )
+                file_meta = self.__update_file_meta(
+                    file_path=str(file_path),
+                    file_meta=file_meta,
+                    get_by_path_result=get_by_path_result,
+                )
+            else:
+                # 不行再通过文件父目录来查
+                if str(file_path.parent) != mon_path:
+                    parent_path = str(file_path.parent)
+                    get_by_path_result = None
+
+                    # 尝试获取get_by_path_result，最多parent 3次
+                    for _ in range(3):
+                        # 如果父路径已经是mon_path了，就没意义了
+                        if parent_path == mon_path:
+                            break
 
-                        if get_by_path_result:
-                            logger.info(
-                                f"通过文件父目录 {parent_path} 从历史下载记录中获取到tmdbid={get_by_path_result.tmdbid}，type={get_by_path_result.type}"
-                            )
-                            file_meta = self.__update_file_meta(
-                                file_path=str(file_path),
-                                file_meta=file_meta,
-                                get_by_path_result=get_by_path_result,
-                            )
-                    else:
-                        logger.info(
-                            f"未从历史下载记录中获取到 {str(file_path)} 的tmdbid和type，只能走正常识别流程"
+                        get_by_path_result = self.__get_download_history(
+                            mon_path, parent_path
                         )
+                        if get_by_path_result:
+                            break  # 找到结果，跳出循环
 
-                # 判断文件大小
-                if (
-                    self._size
-                    and float(self._size) > 0
-                    and file_path.stat().st_size < float(self._size) * 1024**3
-                ):
-                    logger.info(f"{file_path} 文件大小小于监控文件大小，不处理")
-                    return
+                        parent_path = str(Path(parent_path).parent)  # 获取父目录路径
 
-                # 查询转移目的目录
-                target: Path = self._dirconf.get(mon_path)
-                # 查询转移方式
-                transfer_type = self._transferconf.get(mon_path)
+                    if get_by_path_result:
+                        logger.info(
+                            f"通过文件父目录 {parent_path} 从历史下载记录中获取到tmdbid={get_by_path_result.tmdbid}，type={get_by_path_result.type}"
+                        )
+                        file_meta = self.__update_file_meta(
+                            file_path=str(file_path),
+                            file_meta=file_meta,
+                            get_by_path_result=get_by_path_result,
+                        )
+                else:
+                    logger.info(
+                        f"未从历史下载记录中获取到 {str(file_path)} 的tmdbid和type，只能走正常识别流程"
+                    )
 
-                # 查找这个文件项
-                file_item = self.storagechain.get_file_item(
-                    storage="local", path=file_path
+            # 判断文件大小
+            if (
+                self._size
+                and float(self._size) > 0
+                and (
+                    file_stat.st_size
+                    if file_stat is not None and str(file_path) == event_path
+                    else file_path.stat().st_size
+                )
+                < float(self._size) * 1024**3
+            ):
+                logger.info(f"{file_path} 文件大小小于监控文件大小，不处理")
+                metrics.skip("too_small")
+                self.__record_file_state(
+                    event_path, file_stat, FileStateIndex.TOO_SMALL
                 )
-                if not file_item:
-                    logger.warn(f"{event_path.name} 未找到对应的文件")
+                return
+
+            # 查询转移目的目录
+            target: Path = self._dirconf.get(mon_path)
+            # 查询转移方式
+            transfer_type = self._transferconf.get(mon_path)
+
+            # 查找这个文件项
+            file_item = self.storagechain.get_file_item(storage="local", path=file_path)
+            if not file_item:
+                # 遍历后被其他流程移走或删除的文件不算失败
+                if not file_path.exists():
+                    logger.debug(f"{file_path} 已不存在，跳过")
                     return
-                # 识别媒体信息
-                mediainfo: MediaInfo = self.chain.recognize_media(meta=file_meta)
-                if not mediainfo:
-                    logger.warn(f"未识别到媒体信息，标题: {file_meta.name}")
-                    # 新增转移成功历史记录
-                    his = self.transferhis.add_fail(
+                logger.warn(f"{file_path.name} 未找到对应的文件")
+                self.__record_failure(metrics, mon_path, event_path, "no_file_item")
+                return
+            # 识别媒体信息
+            with metrics.stage("recognize"):
+                mediainfo: MediaInfo = self.__recognize_media(file_meta)
+            if not mediainfo:
+                logger.warn(f"未识别到媒体信息，标题: {file_meta.name}")
+                self.__record_failure(metrics, mon_path, event_path, "no_mediainfo")
+                # 新增转移成功历史记录
+                with metrics.stage("history"), lock:
+                    self.transferhis.add_fail(
                         fileitem=file_item, mode=transfer_type, meta=file_meta
                     )
-                    if self._notify:
-                        self.post_message(
-                            mtype=NotificationType.Manual,
-                            title=f"{file_path.name} 未识别到媒体信息，无法入库！\n"
-                        )
-                    # 转移失败文件到指定目录
-                    if (
-                        self._pathAfterMoveFailure is not None
-                        and self._transfer_type == "move"
-                        and self._move_failed_files
-                    ):
-                        self.moveFailedFilesToPath(
-                            "未识别到媒体信息", file_item.path
-                        )
-                    return
-
-                # 如果未开启新增已入库媒体是否跟随TMDB信息变化则根据tmdbid查询之前的title
-                if not settings.SCRAP_FOLLOW_TMDB:
-                    transfer_history = self.transferhis.get_by_type_tmdbid(
-                        tmdbid=mediainfo.tmdb_id, mtype=mediainfo.type.value
+                self.__mark_transferred(mon_path, file_item.path)
+                if self._notify:
+                    self.post_message(
+                        mtype=NotificationType.Manual,
+                        title=f"{file_path.name} 未识别到媒体信息，无法入库！\n",
                     )
-                    if transfer_history:
-                        mediainfo.title = transfer_history.title
-                logger.info(
-                    f"{file_path.name} 识别为: {mediainfo.type.value} {mediainfo.title_year}"
+                # 转移失败文件到指定目录
+                if (
+                    self._pathAfterMoveFailure is not None
+                    and self._transfer_type == "move"
+                    and self._move_failed_files
+                ):
+                    # 移动失败或插件停止未移动时文件留在原处，不记录索引，下次扫描重新处理
+                    self.moveFailedFilesToPath("未识别到媒体信息", file_item.path)
+                else:
+                    self.__record_file_state(
+                        event_path, file_stat, FileStateIndex.UNRECOGNIZED
+                    )
+                return
+
+            # 如果未开启新增已入库媒体是否跟随TMDB信息变化则根据tmdbid查询之前的title
+            if not settings.SCRAP_FOLLOW_TMDB:
+                transfer_history = self.transferhis.get_by_type_tmdbid(
+                    tmdbid=mediainfo.tmdb_id, mtype=mediainfo.type.value
                 )
+                if transfer_history:
+                    mediainfo.title = transfer_history.title
+            logger.info(
+                f"{file_path.name} 识别为: {mediainfo.type.value} {mediainfo.title_year}"
+            )
 
-                # 获取集数据
-                if mediainfo.type == MediaType.TV:
-                    episodes_info = self.tmdbchain.tmdb_episodes(
+            # 获取集数据
+            if mediainfo.type == MediaType.TV:
+                with metrics.stage("tmdb_episodes"):
+                    episodes_info = self.__get_tmdb_episodes(
                         tmdbid=mediainfo.tmdb_id,
                         season=(
                             1
                             if file_meta.begin_season is None
                             else file_meta.begin_season
-                        ),
-                    )
-                else:
-                    episodes_info = None
-
-                # 查询转移目的目录
-                target_dir = DirectoryHelper().get_dir(
-                    mediainfo, src_path=Path(mon_path)
-                )
-                if (
-                    not target_dir
-                    or not target_dir.library_path
-                    or not target_dir.download_path.startswith(mon_path)
-                ):
-                    target_dir = TransferDirectoryConf()
-                    target_dir.library_path = target
-                    target_dir.transfer_type = transfer_type
-                    target_dir.scraping = self._scrape
-                    target_dir.renaming = True
-                    target_dir.notify = False
-                    target_dir.overwrite_mode = (
-                        self._overwrite_mode.get(mon_path) or "never"
-                    )
-                    target_dir.library_storage = "local"
-                    target_dir.library_category_folder = self._category
-                else:
-                    target_dir.transfer_type = transfer_type
-                    target_dir.scraping = self._scrape
-
-                if not target_dir.library_path:
-                    logger.error(f"未配置源目录 {mon_path} 的目的目录")
-                    return
-
-                # 下载器限速
-                is_download_speed_limited = False
-                if (
-                    target_dir.transfer_type
-                    in [
-                        "move",
-                        "copy",
-                        "rclone_copy",
-                        "rclone_move",
-                    ]
-                    and "不限速-autoTransfer" not in self._downloaders
-                    and self._downloaderSpeedLimit != 0
-                ):
-                    logger.info(
-                        f"下载器限速 - {', '.join(self._downloaders)}，下载速度限制为 {self._downloaderSpeedLimit} KiB/s，因正在移动或复制文件{file_item.path}"
-                    )
-                    try:
-                        # 先获取当前下载器的限速
-                        download_limit_current_val, _ = (
-                            self.get_downloader_limit_current_val()
-                        )
-                        if (
-                            float(download_limit_current_val)
-                            > float(self._downloaderSpeedLimit)
-                            or float(download_limit_current_val) == 0
-                        ):
-                            is_download_speed_limited = self.set_download_limit(
-                                self._downloaderSpeedLimit
-                            )
-                        else:
-                            logger.info(
-                                f"不用设置下载器限速，当前下载器限速为 {download_limit_current_val} KiB/s 大于或等于设定值 {self._downloaderSpeedLimit} KiB/s"
-                            )
-                    except Exception as e:
-                        logger.error(
-                            f"下载器限速失败，请检查下载器 {', '.join(self._downloaders)} 的连通性，本次整理将跳过下载器限速"
-                        )
-                        logger.debug(
-                            f"下载器限速失败: {str(e)}, traceback={traceback.format_exc()}"
-                        )
-                        is_download_speed_limited = False
+                        ),
+                    )
+            else:
+                episodes_info = None
 
-                    if not is_download_speed_limited:
-                        logger.debug(f"下载器{', '.join(self._downloaders)} 限速失败")
-                else:
-                    if "不限速-autoTransfer" in self._downloaders:
-                        log_msg = "已勾选'不限速'或勾选需限速的下载器，默认关闭限速"
-                    elif self._downloaderSpeedLimit == 0:
-                        log_msg = "下载速度限制为0或为空，默认关闭限速"
-                    elif target_dir.transfer_type not in [
-                        "move",
-                        "copy",
-                        "rclone_copy",
-                        "rclone_move",
-                    ]:
-                        log_msg = "转移方式不是移动或复制，下载器限速默认关闭"
-                    logger.info(log_msg)
-
-                # 转移文件
-                transferinfo: TransferInfo = self.chain.transfer(
-                    fileitem=file_item,
-                    meta=file_meta,
-                    mediainfo=mediainfo,
-                    target_directory=target_dir,
-                    episodes_info=episodes_info,
+            # 查询转移目的目录
+            with metrics.stage("get_dir"):
+                target_dir = DirectoryHelper().get_dir(
+                    mediainfo, src_path=Path(mon_path)
                 )
+            if (
+                not target_dir
+                or not target_dir.library_path
+                or not target_dir.download_path.startswith(mon_path)
+            ):
+                target_dir = TransferDirectoryConf()
+                target_dir.library_path = target
+                target_dir.transfer_type = transfer_type
+                target_dir.scraping = self._scrape
+                target_dir.renaming = True
+                target_dir.notify = False
+                target_dir.overwrite_mode = (
+                    self._overwrite_mode.get(mon_path) or "never"
+                )
+                target_dir.library_storage = "local"
+                target_dir.library_category_folder = self._category
+            else:
+                target_dir.transfer_type = transfer_type
+                target_dir.scraping = self._scrape
+
+            if not target_dir.library_path:
+                logger.error(f"未配置源目录 {mon_path} 的目的目录")
+                self.__record_failure(metrics, mon_path, event_path, "no_target")
+                return
+
+            # 下载器限速
+            is_download_speed_limited = False
+            if (
+                target_dir.transfer_type
+                in [
+                    "move",
+                    "copy",
+                    "rclone_copy",
+                    "rclone_move",
+                ]
+                and "不限速-autoTransfer" not in self._downloaders
+                and self._downloaderSpeedLimit != 0
+            ):
+                with metrics.stage("speed_limit"):
+                    is_download_speed_limited = self.__acquire_download_limit(
+                        f"因正在移动或复制文件{file_item.path}"
+                    )
+            else:
+                if "不限速-autoTransfer" in self._downloaders:
+                    log_msg = "已勾选'不限速'或勾选需限速的下载器，默认关闭限速"
+                elif self._downloaderSpeedLimit == 0:
+                    log_msg = "下载速度限制为0或为空，默认关闭限速"
+                elif target_dir.transfer_type not in [
+                    "move",
+                    "copy",
+                    "rclone_copy",
+                    "rclone_move",
+                ]:
+                    log_msg = "转移方式不是移动或复制，下载器限速默认关闭"
+                logger.info(log_msg)
+
+            # 转移文件
+            try:
+                with metrics.stage("transfer"):
+                    transferinfo: TransferInfo = self.chain.transfer(
+                        fileitem=file_item,
+                        meta=file_meta,
+                        mediainfo=mediainfo,
+                        target_directory=target_dir,
+                        episodes_info=episodes_info,
+                    )
+            finally:
                 # 恢复原速
                 if is_download_speed_limited:
-                    recover_download_limit_success = self.set_download_limit(
-                        download_limit_current_val
-                    )
-                    if recover_download_limit_success:
-                        logger.info("取消下载器限速成功")
-                    else:
-                        logger.error("取消下载器限速失败")
+                    with metrics.stage("speed_limit"):
+                        self.__release_download_limit()
 
-                if not transferinfo:
-                    logger.error("文件转移模块运行失败")
-                    return
+            if not transferinfo:
+                logger.error("文件转移模块运行失败")
+                self.__record_failure(metrics, mon_path, event_path, "transfer_error")
+                return
 
-                if not transferinfo.success:
-                    # 转移失败
-                    logger.warn(f"{file_path.name} 入库失败: {transferinfo.message}")
+            if not transferinfo.success:
+                # 转移失败
+                logger.warn(f"{file_path.name} 入库失败: {transferinfo.message}")
+                self.__record_failure(
+                    metrics,
+                    mon_path,
+                    event_path,
+                    "transfer_failed",
+                    transferinfo.message,
+                )
 
-                    if self._history:
-                        # 新增转移失败历史记录
+                if self._history:
+                    # 新增转移失败历史记录
+                    with metrics.stage("history"), lock:
                         self.transferhis.add_fail(
                             fileitem=file_item,
                             mode=transfer_type,
@@ -849,24 +2818,28 @@ class autoTransfer(_PluginBase):
                             mediainfo=mediainfo,
                             transferinfo=transferinfo,
                         )
-                    if self._notify:
-                        self.post_message(
-                            mtype=NotificationType.Manual,
-                            title=f"{mediainfo.title_year}{file_meta.season_episode} 入库失败！",
-                            text=f"原因: {transferinfo.message or '未知'}",
-                            image=mediainfo.get_message_image(),
-                        )
-                    # 转移失败文件到指定目录
-                    if (
-                        self._pathAfterMoveFailure is not None
-                        and self._transfer_type == "move"
-                        and self._move_failed_files
-                    ):
-                        self.moveFailedFilesToPath(transferinfo.message, file_item.path)
-                    return
+                    self.__mark_transferred(mon_path, file_item.path)
+                if self._notify:
+                    self.post_message(
+                        mtype=NotificationType.Manual,
+                        title=f"{mediainfo.title_year}{file_meta.season_episode} 入库失败！",
+                        text=f"原因: {transferinfo.message or '未知'}",
+                        image=mediainfo.get_message_image(),
+                    )
+                # 转移失败文件到指定目录
+                if (
+                    self._pathAfterMoveFailure is not None
+                    and self._transfer_type == "move"
+                    and self._move_failed_files
+                ):
+                    self.moveFailedFilesToPath(transferinfo.message, file_item.path)
+                return
 
-                if self._history:
-                    # 新增转移成功历史记录
+            metrics.success(transferinfo.total_size, mon_path=mon_path)
+
+            if self._history:
+                # 新增转移成功历史记录
+                with metrics.stage("history"), lock:
                     self.transferhis.add_success(
                         fileitem=file_item,
                         mode=transfer_type,
@@ -874,108 +2847,68 @@ class autoTransfer(_PluginBase):
                         mediainfo=mediainfo,
                         transferinfo=transferinfo,
                     )
+                self.__mark_transferred(mon_path, file_item.path)
 
-                if self._notify:
-                    # 发送消息汇总
-                    media_list = (
-                        self._medias.get(mediainfo.title_year + " " + file_meta.season)
-                        or {}
-                    )
-                    if media_list:
-                        media_files = media_list.get("files") or []
-                        if media_files:
-                            file_exists = False
-                            for file in media_files:
-                                if str(file_path) == file.get("path"):
-                                    file_exists = True
-                                    break
-                            if not file_exists:
-                                media_files.append(
-                                    {
-                                        "path": str(file_path),
-                                        "mediainfo": mediainfo,
-                                        "file_meta": file_meta,
-                                        "transferinfo": transferinfo,
-                                    }
-                                )
-                        else:
-                            media_files = [
-                                {
-                                    "path": str(file_path),
-                                    "mediainfo": mediainfo,
-                                    "file_meta": file_meta,
-                                    "transferinfo": transferinfo,
-                                }
-                            ]
-                        media_list = {
-                            "files": media_files,
-                            "time": datetime.datetime.now(),
-                        }
-                    else:
-                        media_list = {
-                            "files": [
-                                {
-                                    "path": str(file_path),
-                                    "mediainfo": mediainfo,
-                                    "file_meta": file_meta,
-                                    "transferinfo": transferinfo,
-                                }
-                            ],
-                            "time": datetime.datetime.now(),
-                        }
-                    self._medias[mediainfo.title_year + " " + file_meta.season] = (
-                        media_list
-                    )
+            if self._notify:
+                # 发送消息汇总，电影下次检查即发送，剧集在最后一集入库一段时间后发送
+                self._notify_aggregator.add(
+                    key=mediainfo.title_year + " " + file_meta.season,
+                    path=str(file_path),
+                    item={
+                        "path": str(file_path),
+                        "mediainfo": mediainfo,
+                        "file_meta": file_meta,
+                        "transferinfo": transferinfo,
+                    },
+                    delay=(
+                        0 if mediainfo.type == MediaType.MOVIE else int(self._interval)
+                    ),
+                )
 
-                if self._refresh:
-                    # 广播事件
-                    self.eventmanager.send_event(
-                        EventType.TransferComplete,
-                        {
-                            "meta": file_meta,
-                            "mediainfo": mediainfo,
-                            "transferinfo": transferinfo,
-                        },
-                    )
+            if self._refresh:
+                # 广播事件
+                self.eventmanager.send_event(
+                    EventType.TransferComplete,
+                    {
+                        "meta": file_meta,
+                        "mediainfo": mediainfo,
+                        "transferinfo": transferinfo,
+                    },
+                )
 
-                if self._softlink:
-                    # 通知实时软连接生成
-                    self.eventmanager.send_event(
-                        EventType.PluginAction,
-                        {
-                            "file_path": str(transferinfo.target_item.path),
-                            "action": "softlink_file",
-                        },
-                    )
+            if self._softlink:
+                # 通知实时软连接生成
+                self.eventmanager.send_event(
+                    EventType.PluginAction,
+                    {
+                        "file_path": str(transferinfo.target_item.path),
+                        "action": "softlink_file",
+                    },
+                )
 
-                if self._strm:
-                    # 通知Strm助手生成
-                    self.eventmanager.send_event(
-                        EventType.PluginAction,
-                        {
-                            "file_path": str(transferinfo.target_item.path),
-                            "action": "cloudstrm_file",
-                        },
-                    )
+            if self._strm:
+                # 通知Strm助手生成
+                self.eventmanager.send_event(
+                    EventType.PluginAction,
+                    {
+                        "file_path": str(transferinfo.target_item.path),
+                        "action": "cloudstrm_file",
+                    },
+                )
 
-                # 移动模式删除空目录
-                if transfer_type == "move" and self._del_empty_dir:
-                    for file_dir in file_path.parents:
-                        if len(str(file_dir)) <= len(str(Path(mon_path))):
-                            # 重要，删除到监控目录为止
-                            break
-                        files = SystemUtils.list_files(
-                            file_dir, settings.RMT_MEDIAEXT + settings.DOWNLOAD_TMPEXT
-                        )
-                        if not files:
-                            logger.warn(f"移动模式，删除空目录: {file_dir}")
-                            shutil.rmtree(file_dir, ignore_errors=True)
+            # 移动模式删除空目录，记录下来在整个监控目录处理完后统一删除
+            if transfer_type == "move" and self._del_empty_dir:
+                with lock:
+                    self._touched_dirs.setdefault(mon_path, set()).add(file_path.parent)
+
+            self.__record_file_state(event_path, file_stat, FileStateIndex.TRANSFERRED)
 
-                # 返回成功的文件
-                return transferinfo, mediainfo, file_meta
+            # 返回成功的文件
+            return transferinfo, mediainfo, file_meta
 
         except Exception as e:
             logger.error(f"目录监控发生错误: {str(e)} - {traceback.format_exc()}")
+            self.__record_failure(metrics, mon_path, event_path, "error", str(e))
             return
 
     def send_transfer_message(
@@ -1027,197 +2960,7 @@ class autoTransfer(_PluginBase):
         if hasattr(mediainfo, "original_language") and bool(
             mediainfo.original_language
         ):
-            language_mapping = {
-                "kw": "康沃尔语",
-                "ff": "富拉语",
-                "gn": "瓜拉尼语",
-                "id": "印尼语",
-                "lu": "卢巴-加丹加语",
-                "nr": "恩德贝莱语",
-                "os": "奥塞梯语",
-                "ru": "俄语",
-                "se": "北萨米语",
-                "so": "索马里语",
-                "es": "西班牙语",
-                "sv": "瑞典语",
-                "ta": "泰米尔语",
-                "te": "泰卢固语",
-                "tn": "茨瓦纳语",
-                "uk": "乌克兰语",
-                "uz": "乌兹别克语",
-                "el": "希腊语",
-                "co": "科西嘉语",
-                "dv": "迪维希语",
-                "kk": "哈萨克语",
-                "ki": "基库尤语",
-                "or": "奥里亚语",
-                "si": "僧伽罗语",
-                "st": "索托语",
-                "sr": "塞尔维亚语",
-                "ss": "斯瓦蒂语",
-                "tr": "土耳其语",
-                "wa": "瓦隆语",
-                "cn": "粤语",
-                "bi": "比斯拉马语",
-                "cr": "克里语",
-                "cy": "威尔士语",
-                "eu": "巴斯克语",
-                "hz": "赫雷罗语",
-                "ho": "希里莫图语",
-                "ka": "格鲁吉亚语",
-                "kr": "卡努里语",
-                "km": "高棉语",
-                "kj": "宽亚玛语",
-                "to": "汤加语",
-                "vi": "越南语",
-                "zu": "祖鲁语",
-                "zh": "中文",
-                "ps": "普什图语",
-                "mk": "马其顿语",
-                "ae": "阿维斯陀语",
-                "az": "阿塞拜疆语",
-                "ba": "巴什基尔语",
-                "sh": "塞尔维亚-克罗地亚语",
-                "lv": "拉脱维亚语",
-                "lt": "立陶宛语",
-                "ms": "马来语",
-                "rm": "罗曼什语",
-                "as": "阿萨姆语",
-                "gd": "盖尔语",
-                "ja": "日语",
-                "ko": "韩语",
-                "ku": "库尔德语",
-                "mo": "摩尔多瓦语",
-                "mn": "蒙古语",
-                "nb": "书面挪威语",
-                "om": "奥罗莫语",
-                "pi": "巴利语",
-                "sq": "阿尔巴尼亚语",
-                "vo": "沃拉普克语",
-                "bo": "藏语",
-                "da": "丹麦语",
-                "kl": "格陵兰语",
-                "kn": "卡纳达语",
-                "nl": "荷兰语",
-                "nn": "新挪威语",
-                "sa": "梵语",
-                "am": "阿姆哈拉语",
-                "hy": "亚美尼亚语",
-                "bs": "波斯尼亚语",
-                "hr": "克罗地亚语",
-                "mh": "马绍尔语",
-                "mg": "马拉加斯语",
-                "ne": "尼泊尔语",
-                "su": "巽他语",
-                "ts": "聪加语",
-                "ug": "维吾尔语",
-                "cs": "捷克语",
-                "jv": "爪哇语",
-                "ro": "罗马尼亚语",
-                "sm": "萨摩亚语",
-                "tg": "塔吉克语",
-                "wo": "沃洛夫语",
-                "br": "布列塔尼语",
-                "fr": "法语",
-                "ga": "爱尔兰语",
-                "ht": "海地克里奥尔语",
-                "kv": "科米语",
-                "mi": "毛利语",
-                "th": "泰语",
-                "xx": "无语言",
-                "af": "南非荷兰语",
-                "av": "阿瓦尔语",
-                "bm": "班巴拉语",
-                "ca": "加泰罗尼亚语",
-                "ce": "车臣语",
-                "de": "德语",
-                "gv": "马恩语",
-                "rw": "卢旺达语",
-                "ky": "吉尔吉斯语",
-                "ln": "林加拉语",
-                "sn": "绍纳语",
-                "yi": "意第绪语",
-                "be": "白俄罗斯语",
-                "cu": "教会斯拉夫语",
-                "dz": "宗喀语",
-                "eo": "世界语",
-                "fi": "芬兰语",
-                "fy": "弗里西语",
-                "ie": "西方国际语",
-                "ia": "国际语",
-                "it": "意大利语",
-                "ng": "恩敦加语",
-                "pa": "旁遮普语",
-                "pt": "葡萄牙语",
-                "rn": "隆迪语",
-                "fa": "波斯语",
-                "ch": "查莫罗语",
-                "cv": "楚瓦什语",
-                "en": "英语",
-                "hu": "匈牙利语",
-                "ii": "彝语",
-                "kg": "刚果语",
-                "li": "林堡语",
-                "ml": "马拉雅拉姆语",
-                "nv": "纳瓦霍语",
-                "ny": "齐切瓦语",
-                "sg": "桑戈语",
-                "tw": "契维语",
-                "ab": "阿布哈兹语",
-                "ar": "阿拉伯语",
-                "ee": "埃维语",
-                "fo": "法罗语",
-                "ik": "伊努皮克语",
-                "ks": "克什米尔语",
-                "lb": "卢森堡语",
-                "nd": "北恩德贝莱语",
-                "oc": "奥克语",
-                "sk": "斯洛伐克语",
-                "tt": "鞑靼语",
-                "ve": "文达语",
-                "ay": "艾马拉语",
-                "fj": "斐济语",
-                "gu": "古吉拉特语",
-                "io": "伊多语",
-                "lo": "老挝语",
-                "la": "拉丁语",
-                "no": "挪威语",
-                "oj": "奥吉布瓦语",
-                "pl": "波兰语",
-                "qu": "克丘亚语",
-                "sl": "斯洛文尼亚语",
-                "sc": "萨丁尼亚语",
-                "sw": "斯瓦希里语",
-                "tl": "他加禄语",
-                "ur": "乌尔都语",
-                "bg": "保加利亚语",
-                "hi": "印地语",
-                "yo": "约鲁巴语",
-                "ak": "阿坎语",
-                "an": "阿拉贡语",
-                "bn": "孟加拉语",
-                "et": "爱沙尼亚语",
-                "gl": "加利西亚语",
-                "ha": "豪萨语",
-                "ig": "伊博语",
-                "iu": "因纽特语",
-                "lg": "卢干达语",
-                "mr": "马拉地语",
-                "mt": "马耳他语",
-                "my": "缅甸语",
-                "na": "瑙鲁语",
-                "sd": "信德语",
-                "xh": "科萨语",
-                "za": "壮语",
-                "aa": "阿法尔语",
-                "is": "冰岛语",
-                "ty": "塔希提语",
-                "ti": "提格利尼亚语",
-                "tk": "土库曼语",
-                "he": "希伯来语",
-            }
-
-            msg_str = f"{msg_str}\n🗣 原始语言: {language_mapping.get(mediainfo.original_language, mediainfo.original_language)}"
+            msg_str = f"{msg_str}\n🗣 原始语言: {LANGUAGE_MAPPING.get(mediainfo.original_language, mediainfo.original_language)}"
         # 电影才有mediainfo.release_date?
         if (
             mediainfo.type == MediaType.MOVIE
@@ -1240,16 +2983,7 @@ class autoTransfer(_PluginBase):
                 f"{msg_str}\n📅 最后播出日期: {mediainfo.tmdb_info['last_air_date']}"
             )
         if hasattr(mediainfo, "status") and bool(mediainfo.status):
-            status_translation = {
-                "Returning Series": "回归系列",
-                "Ended": "已完结",
-                "In Production": "制作中",
-                "Canceled": "已取消",
-                "Planned": "计划中",
-                "Released": "已发布",
-            }
-
-            msg_str = f"{msg_str}\n✅ 完结状态: {status_translation[mediainfo.status] if mediainfo.status in status_translation else '未知状态'}"
+            msg_str = f"{msg_str}\n✅ 完结状态: {STATUS_TRANSLATION.get(mediainfo.status, '未知状态')}"
         if hasattr(mediainfo, "vote_average") and bool(mediainfo.vote_average):
             msg_str = f"{msg_str}\n⭐ 观众评分: {mediainfo.vote_average}"
         if hasattr(mediainfo, "genres") and bool(mediainfo.genres):
@@ -1275,82 +3009,53 @@ class autoTransfer(_PluginBase):
         """
         定时检查是否有媒体处理完，发送统一消息
         """
-        if not self._medias or not self._medias.keys():
+        if not self._notify_aggregator:
             return
 
-        # 遍历检查是否已刮削完，发送消息
-        for medis_title_year_season in list(self._medias.keys()):
-            media_list = self._medias.get(medis_title_year_season)
+        # 只处理已到发送时间的媒体
+        for medis_title_year_season, media_files in self._notify_aggregator.pop_due():
             logger.info(f"开始处理媒体 {medis_title_year_season} 消息")
-
-            if not media_list:
+            if not media_files or not self._notify:
                 continue
 
-            # 获取最后更新时间
-            last_update_time = media_list.get("time")
-            media_files = media_list.get("files")
-            if not last_update_time or not media_files:
-                continue
+            # 汇总处理文件总大小
+            total_size = 0
+            file_count = 0
 
-            transferinfo = media_files[0].get("transferinfo")
-            file_meta = media_files[0].get("file_meta")
-            mediainfo = media_files[0].get("mediainfo")
-            # 判断剧集最后更新时间距现在是已超过10秒或者电影，发送消息
-            if (datetime.datetime.now() - last_update_time).total_seconds() > int(
-                self._interval
-            ) or mediainfo.type == MediaType.MOVIE:
-                # 发送通知
-                if self._notify:
+            # 剧集汇总
+            episodes = []
+            for file in media_files:
+                transferinfo = file.get("transferinfo")
+                total_size += transferinfo.total_size
+                file_count += 1
 
-                    # 汇总处理文件总大小
-                    total_size = 0
-                    file_count = 0
-
-                    # 剧集汇总
-                    episodes = []
-                    for file in media_files:
-                        transferinfo = file.get("transferinfo")
-                        total_size += transferinfo.total_size
-                        file_count += 1
-
-                        file_meta = file.get("file_meta")
-                        if file_meta and file_meta.begin_episode:
-                            episodes.append(file_meta.begin_episode)
-
-                    transferinfo.total_size = total_size
-                    # 汇总处理文件数量
-                    transferinfo.file_count = file_count
-
-                    # 剧集季集信息 S01 E01-E04 || S01 E01、E02、E04
-                    season_episode = None
-                    # 处理文件多，说明是剧集，显示季入库消息
-                    if mediainfo.type == MediaType.TV:
-                        # 季集文本
-                        season_episode = (
-                            f"{file_meta.season} {StringUtils.format_ep(episodes)}"
-                        )
-                    # 发送消息
-                    # self.transferchain.send_transfer_message(
-                    #     meta=file_meta,
-                    #     mediainfo=mediainfo,
-                    #     transferinfo=transferinfo,
-                    #     season_episode=season_episode,
-                    # )
-                    try:
-                        self.send_transfer_message(
-                            meta=file_meta,
-                            mediainfo=mediainfo,
-                            transferinfo=transferinfo,
-                            season_episode=season_episode,
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"发送消息失败: {str(e)}, traceback={traceback.format_exc()}"
-                        )
-                        del self._medias[medis_title_year_season]
-                # 发送完消息，移出key
-                del self._medias[medis_title_year_season]
-                continue
+                file_meta = file.get("file_meta")
+                if file_meta and file_meta.begin_episode:
+                    episodes.append(file_meta.begin_episode)
+
+            mediainfo = media_files[0].get("mediainfo")
+            transferinfo.total_size = total_size
+            # 汇总处理文件数量
+            transferinfo.file_count = file_count
+
+            # 剧集季集信息 S01 E01-E04 || S01 E01、E02、E04
+            season_episode = None
+            # 处理文件多，说明是剧集，显示季入库消息
+            if mediainfo.type == MediaType.TV:
+                # 季集文本
+                season_episode = f"{file_meta.season} {StringUtils.format_ep(episodes)}"
+            # 发送消息
+            try:
+                self.send_transfer_message(
+                    meta=file_meta,
+                    mediainfo=mediainfo,
+                    transferinfo=transferinfo,
+                    season_episode=season_episode,
+                )
+            except Exception as e:
+                logger.error(
+                    f"发送消息失败: {str(e)}, traceback={traceback.format_exc()}"
+                )
 
     def get_state(self) -> bool:
         return self._enabled
@@ -1360,7 +3065,31 @@ class autoTransfer(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        """
+        return [
+            {
+                "path": "/metrics",
+                "endpoint": self.get_metrics,
+                "methods": ["GET"],
+                "auth": "bear",
+                "summary": "运行统计",
+                "description": "获取正在进行和最近几次整理的文件数、跳过及失败原因和各阶段耗时",
+            }
+        ]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        API: 运行统计
+        """
+        current = self._current_metrics
+        return {
+            "current": current.to_dict() if current else None,
+            "history": [
+                metrics.to_dict() for metrics in reversed(self._metrics_history or [])
+            ],
+        }
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -1544,6 +3273,34 @@ class autoTransfer(_PluginBase):
                                                     }
                                                 ],
                                             },
+                                            {
+                                                "component": "VCol",
+                                                "props": {"cols": 12, "md": 3},
+                                                "content": [
+                                                    {
+                                                        "component": "VSwitch",
+                                                        "props": {
+                                                            "model": "incremental_scan",
+                                                            "label": "增量扫描",
+                                                            "hint": "跳过未变化且已处理过的文件，立即运行一次时仍全量扫描",
+                                                        },
+                                                    }
+                                                ],
+                                            },
+                                            {
+                                                "component": "VCol",
+                                                "props": {"cols": 12, "md": 3},
+                                                "content": [
+                                                    {
+                                                        "component": "VSwitch",
+                                                        "props": {
+                                                            "model": "realtime",
+                                                            "label": "实时监控",
+                                                            "hint": "监控目录有新文件时立即整理，定时任务作为兜底",
+                                                        },
+                                                    }
+                                                ],
+                                            },
                                         ],
                                     }
                                 ],
@@ -1640,6 +3397,87 @@ class autoTransfer(_PluginBase):
                                     }
                                 ],
                             },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 3, "md": 3},
+                                "content": [
+                                    {
+                                        "component": "VTextField",
+                                        "props": {
+                                            "model": "max_workers",
+                                            "label": "整理线程数",
+                                            "placeholder": "1",
+                                            "hint": "0为按目的目录所在磁盘数自动分配",
+                                        },
+                                    }
+                                ],
+                            },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 3, "md": 3},
+                                "content": [
+                                    {
+                                        "component": "VTextField",
+                                        "props": {
+                                            "model": "realtime_delay",
+                                            "label": "实时监控防抖时间(秒)",
+                                            "placeholder": "30",
+                                            "hint": "文件在此时间内大小不再变化才开始整理",
+                                        },
+                                    }
+                                ],
+                            },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 3, "md": 3},
+                                "content": [
+                                    {
+                                        "component": "VTextField",
+                                        "props": {
+                                            "model": "episodes_cache_ttl",
+                                            "label": "集信息缓存时间(分钟)",
+                                            "placeholder": "0",
+                                            "hint": "0为只在单次运行内缓存",
+                                        },
+                                    }
+                                ],
+                            },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 3, "md": 3},
+                                "content": [
+                                    {
+                                        "component": "VTextField",
+                                        "props": {
+                                            "model": "scrape_workers",
+                                            "label": "刮削线程数",
+                                            "placeholder": "2",
+                                            "hint": "同一目录的文件整理完即开始刮削，与整理并行",
+                                        },
+                                    }
+                                ],
+                            },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 3, "md": 3},
+                                "content": [
+                                    {
+                                        "component": "VSelect",
+                                        "props": {
+                                            "model": "parallel_dirs",
+                                            "label": "监控目录并行方式",
+                                            "items": [
+                                                {"title": "逐个目录处理", "value": ""},
+                                                {"title": "按目录并行", "value": "dir"},
+                                                {
+                                                    "title": "按磁盘并行",
+                                                    "value": "device",
+                                                },
+                                            ],
+                                        },
+                                    }
+                                ],
+                            },
                         ],
                     },
                     {
@@ -1706,14 +3544,23 @@ class autoTransfer(_PluginBase):
                             },
                             {
                                 "component": "VCol",
-                                "props": {"cols": 12, "md": 5},
+                                "props": {"cols": 12, "md": 3},
                                 "content": [
                                     {
-                                        "component": "VSwitch",
+                                        "component": "VSelect",
                                         "props": {
-                                            "model": "pre_cancel_speed_limit",
-                                            "label": "每次运行前取消qb限速",
-                                            "hint": "每次运行插件前强制取消下载器限速（防止意外断电后限速未恢复）",
+                                            "model": "speed_limit_mode",
+                                            "label": "限速方式",
+                                            "items": [
+                                                {
+                                                    "title": "整理期间只限速一次",
+                                                    "value": "session",
+                                                },
+                                                {
+                                                    "title": "每个文件单独限速",
+                                                    "value": "per_file",
+                                                },
+                                            ],
                                         },
                                     }
                                 ],
@@ -1882,7 +3729,7 @@ class autoTransfer(_PluginBase):
                                         "props": {
                                             "type": "info",
                                             "variant": "tonal",
-                                            "text": "1.入库消息延迟默认10s，如网络较慢可酌情调大，有助于发送统一入库消息。\n2.源目录与目的目录设置一致，则默认使用目录设置配置。否则可在源目录后拼接@覆盖方式（默认never覆盖方式）。\n3.开启软连接/Strm会在监控转移后联动【实时软连接】/【云盘Strm[助手]】插件生成软连接/Strm（只处理媒体文件，不处理刮削文件）。\n4.启用此插件后，可将`设定`--`存储&目录`--`目录`--`自动整理`改为`不整理`或`手动整理`\n5.`转移时下载器限速`只在移动模式生效，他会在每次移动前，限制下载器速度，转移完成后再恢复限速前的速度\n\n此插件由thsrite的目录监控插件修改而得\n本意是为了做类似v1的定时整理，因我只用本地移动，原地整理，故也不知软/硬链、Strm之类的是否可用",
+                                            "text": "1.入库消息延迟默认10s，如网络较慢可酌情调大，有助于发送统一入库消息。\n2.源目录与目的目录设置一致，则默认使用目录设置配置。否则可在源目录后拼接@覆盖方式（默认never覆盖方式）。\n3.开启软连接/Strm会在监控转移后联动【实时软连接】/【云盘Strm[助手]】插件生成软连接/Strm（只处理媒体文件，不处理刮削文件）。\n4.启用此插件后，可将`设定`--`存储&目录`--`目录`--`自动整理`改为`不整理`或`手动整理`\n5.`转移时下载器限速`只在移动模式生效，默认在本次整理第一次移动前限制下载器速度，整理结束后再恢复限速前的速度；`限速方式`选择`每个文件单独限速`则每个文件转移前后都会限速和恢复；限速前的速度会记录在插件数据中，插件或容器意外退出后，会在插件重新加载或下次运行时自动恢复\n6.`整理线程数`默认为1，即逐个文件整理；源文件或目的目录分布在多块磁盘时可调大，设为0则每个目的磁盘一个线程\n7.`增量扫描`会记录每个文件(路径、大小、修改时间、inode)上次的处理结果，文件未变化时定时任务直接跳过；修改过滤关键字、整理屏蔽词或最低整理大小后，被排除的文件会重新判断\n8.开启`实时监控`后，监控目录中新增或改名的视频文件在`实时监控防抖时间`内大小不再变化即开始整理，执行周期的定时任务仍会定期全量核对\n9.监控目录分布在多块磁盘时，`监控目录并行方式`选择`按磁盘并行`可让每块磁盘同时整理，同一磁盘上的监控目录仍按顺序处理\n10.每次运行结束会在日志中汇总文件数、跳过及失败原因和各阶段耗时，也可通过插件API `/metrics` 获取最近几次运行的统计；插件详情页可查看正在进行的整理进度、各监控目录吞吐量和最近失败的文件\n\n此插件由thsrite的目录监控插件修改而得\n本意是为了做类似v1的定时整理，因我只用本地移动，原地整理，故也不知软/硬链、Strm之类的是否可用",
                                             "style": {
                                                 "white-space": "pre-line",
                                                 "word-wrap": "break-word",
@@ -1948,16 +3795,235 @@ class autoTransfer(_PluginBase):
             "pathAfterMoveFailure": None,
             "move_failed_files": True,
             "move_excluded_files": True,
-            "pre_cancel_speed_limit": False,
+            "max_workers": 1,
+            "incremental_scan": True,
+            "realtime": False,
+            "realtime_delay": 30,
+            "episodes_cache_ttl": 0,
+            "speed_limit_mode": "session",
+            "scrape_workers": 2,
+            "parallel_dirs": "",
         }
 
     def get_page(self) -> List[dict]:
-        pass
+        """
+        详情页，展示正在进行或最近一次整理的进度，数据来自内存中的运行统计
+        """
+        current = self._current_metrics
+        metrics = current or (
+            self._metrics_history[-1] if self._metrics_history else None
+        )
+        data = metrics.to_dict() if metrics else {}
+
+        # 缓存命中率，运行中取实时数据，否则取最近一次运行结束时的数据
+        caches = dict(data.get("caches") or {})
+        if self._recognize_cache is not None:
+            caches["recognize"] = self._recognize_cache.to_dict()
+        if current and self._episodes_cache is not None:
+            caches["tmdb_episodes"] = self._episodes_cache.to_dict()
+
+        dirs = data.get("dirs") or {}
+        queued = sum(stats["queued"] for stats in dirs.values())
+        if current:
+            status = f"运行中（{data['trigger']}）"
+        elif data:
+            status = f"空闲，上次{data['trigger']}结束于 {data['end_time']}"
+        else:
+            status = "空闲，尚未运行"
+
+        cards = [
+            ("状态", status),
+            (
+                "队列",
+                f"整理中 {queued} 个，实时监控待整理 {len(self._pending_events)} 个，"
+                f"失败文件待移动 {self._relocate_queue.qsize() if self._relocate_queue else 0} 个",
+            ),
+            (
+                "吞吐量",
+                f"{data.get('files_per_minute', 0):.2f} 个/分钟，"
+                f"{data.get('mib_per_second', 0):.2f} MiB/s",
+            ),
+            (
+                "缓存命中率",
+                "，".join(
+                    f"{METRIC_LABELS.get(name, name)} {cache['hit_rate']:.1f}%"
+                    for name, cache in caches.items()
+                )
+                or "暂无",
+            ),
+        ]
+        if data:
+            cards.append(
+                (
+                    "本次统计" if current else "上次统计",
+                    f"发现 {data['seen']} 个，成功 {data['transferred']} 个 "
+                    f"({data['transferred_bytes'] / 2**30:.2f} GiB)，"
+                    f"失败 {data['failed']} 个，跳过 {data['skipped']} 个，"
+                    f"耗时 {data['elapsed']:.0f} 秒",
+                )
+            )
+
+        return [
+            {
+                "component": "VRow",
+                "content": [
+                    {
+                        "component": "VCol",
+                        "props": {"cols": 12, "md": 6 if idx == 4 else 3},
+                        "content": [self.__page_card(title, text)],
+                    }
+                    for idx, (title, text) in enumerate(cards)
+                ],
+            },
+            self.__page_table(
+                title="监控目录",
+                headers=[
+                    "目录",
+                    "状态",
+                    "发现",
+                    "成功",
+                    "失败",
+                    "整理中",
+                    "个/分钟",
+                    "MiB/s",
+                ],
+                rows=[
+                    [
+                        mon_path,
+                        "整理中" if stats["running"] else "已完成",
+                        stats["seen"],
+                        stats["transferred"],
+                        stats["failed"],
+                        stats["queued"],
+                        f"{stats['files_per_minute']:.2f}",
+                        f"{stats['mib_per_second']:.2f}",
+                    ]
+                    for mon_path, stats in dirs.items()
+                ],
+            ),
+            self.__page_table(
+                title="最近失败",
+                headers=["时间", "文件", "原因"],
+                rows=[
+                    [failure["time"], failure["path"], failure["reason"]]
+                    for failure in reversed(self._recent_failures or [])
+                ],
+            ),
+        ]
+
+    @staticmethod
+    def __page_card(title: str, text: str) -> dict:
+        """
+        详情页统计卡片
+        """
+        return {
+            "component": "VCard",
+            "props": {"variant": "tonal"},
+            "content": [
+                {
+                    "component": "VCardText",
+                    "content": [
+                        {
+                            "component": "div",
+                            "props": {"class": "text-caption"},
+                            "text": title,
+                        },
+                        {
+                            "component": "div",
+                            "props": {"class": "text-subtitle-1"},
+                            "text": text,
+                        },
+                    ],
+                }
+            ],
+        }
+
+    @staticmethod
+    def __page_table(title: str, headers: List[str], rows: List[list]) -> dict:
+        """
+        详情页表格
+        """
+        return {
+            "component": "VRow",
+            "content": [
+                {
+                    "component": "VCol",
+                    "props": {"cols": 12},
+                    "content": [
+                        {
+                            "component": "VCard",
+                            "props": {"title": title},
+                            "content": [
+                                {
+                                    "component": "VTable",
+                                    "props": {"hover": True},
+                                    "content": [
+                                        {
+                                            "component": "thead",
+                                            "content": [
+                                                {
+                                                    "component": "th",
+                                                    "props": {
+                                                        "class": "text-start ps-4"
+                                                    },
+                                                    "text": header,
+                                                }
+                                                for header in headers
+                                            ],
+                                        },
+                                        {
+                                            "component": "tbody",
+                                            "content": [
+                                                {
+                                                    "component": "tr",
+                                                    "content": [
+                                                        {
+                                                            "component": "td",
+                                                            "props": {"class": "ps-4"},
+                                                            "text": str(value),
+                                                        }
+                                                        for value in row
+                                                    ],
+                                                }
+                                                for row in rows
+                                            ]
+                                            or [
+                                                {
+                                                    "component": "tr",
+                                                    "content": [
+                                                        {
+                                                            "component": "td",
+                                                            "props": {
+                                                                "colspan": len(headers),
+                                                                "class": "text-center",
+                                                            },
+                                                            "text": "暂无数据",
+                                                        }
+                                                    ],
+                                                }
+                                            ],
+                                        },
+                                    ],
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+        }
 
     def stop_service(self):
         """
         退出插件
         """
+        if self._observers:
+            for observer in self._observers:
+                try:
+                    observer.stop()
+                    observer.join()
+                except Exception as e:
+                    logger.error(f"停止实时监控失败：{str(e)}")
+            self._observers = []
         if self._scheduler:
             self._scheduler.remove_all_jobs()
             if self._scheduler.running:
@@ -1965,6 +4031,14 @@ class autoTransfer(_PluginBase):
                 self._scheduler.shutdown()
                 self._event.clear()
             self._scheduler = None
-
-
-# TODO: 考虑在表plugindata中储存限速状态，防止容器或插件意外退出后没有恢复原速度，有这个就可以删除开关`每次运行前取消qb限速`了
+        self.__stop_relocate_worker()
+        # 按限速日志恢复下载器限速前的速度
+        with speed_limit_lock:
+            self._speed_limit_refs = 0
+            self._speed_limit_sessions = 0
+            self._speed_limit_checked = False
+            self._speed_limit_applied = False
+            try:
+                self.__reconcile_speed_limit_journal()
+            except Exception as e:
+                logger.error(f"恢复下载器限速失败: {str(e)}")
@@ -0,0 +1,95 @@
+"""
+autoSubscribe 的HTTP获取方式离线测试，用保存的响应验证解析结果，不访问网络。
+fixtures 按接口的返回结构构造，接口确认后应替换为真实响应
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+FIXTURES = Path(__file__).parent / "fixtures"
+FETCHERS = Path(__file__).parents[2] / "plugins.v2" / "autosubscribe" / "fetchers.py"
+
+# fetchers 只依赖标准库，不需要MoviePilot环境
+_spec = importlib.util.spec_from_file_location("autosubscribe_fetchers", FETCHERS)
+fetchers = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(fetchers)
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def no_request(url: str):
+    raise AssertionError(f"不应请求网络: {url}")
+
+
+def test_site_fetcher_is_abstract():
+    with pytest.raises(TypeError):
+        fetchers.SiteFetcher(get_text=no_request)
+
+
+def test_iqiyi_parse():
+    tv_list = fetchers.IqiyiFetcher(get_text=no_request).parse(
+        read_fixture("iqiyi_recommend_list.json")
+    )
+    # 没有集数的预告和没有剧名的条目不返回
+    assert tv_list == [
+        {"title": "繁花", "status": "30集全", "year": "0"},
+        {"title": "九重紫", "status": "更新至12集", "year": "0"},
+        {"title": "白色橄榄树", "status": "更新至8集", "year": "0"},
+    ]
+
+
+def test_iqiyi_parse_error_response():
+    fetcher = fetchers.IqiyiFetcher(get_text=no_request)
+    assert fetcher.parse(read_fixture("iqiyi_error.json")) == []
+
+
+def test_youku_parse():
+    tv_list = fetchers.YoukuFetcher(get_text=no_request).parse(
+        read_fixture("youku_webtv_list.html")
+    )
+    # 横幅、推荐位和更新状态不像剧集的条目不返回
+    assert tv_list == [
+        {"title": "永夜星河", "status": "32集全", "year": "0"},
+        {"title": "珠帘玉幕", "status": "更新至24集", "year": "0"},
+        {"title": "似锦", "status": "更新至8集", "year": "0"},
+    ]
+
+
+def test_youku_parse_without_initial_data():
+    fetcher = fetchers.YoukuFetcher(get_text=no_request)
+    assert fetcher.parse("<html><body></body></html>") == []
+
+
+def test_fetch_dedup_and_stop_on_empty_page(monkeypatch):
+    responses = iter(
+        [
+            read_fixture("iqiyi_recommend_list.json"),
+            read_fixture("iqiyi_recommend_list.json"),
+            read_fixture("iqiyi_error.json"),
+        ]
+    )
+    monkeypatch.setattr(fetchers.time, "sleep", lambda seconds: None)
+    fetcher = fetchers.IqiyiFetcher(get_text=lambda url: next(responses))
+
+    tv_list = fetcher.fetch(limit=200)
+
+    # 第二页与第一页重复，第三页为空，停止翻页
+    assert [tv["title"] for tv in tv_list] == ["繁花", "九重紫", "白色橄榄树"]
+
+
+def test_fetch_stops_on_failed_request():
+    fetcher = fetchers.IqiyiFetcher(get_text=lambda url: None)
+    assert fetcher.fetch(limit=100) == []
+
+
+def test_fetch_respects_limit(monkeypatch):
+    monkeypatch.setattr(fetchers.time, "sleep", lambda seconds: None)
+    fetcher = fetchers.IqiyiFetcher(
+        get_text=lambda url: read_fixture("iqiyi_recommend_list.json")
+    )
+
+    assert len(fetcher.fetch(limit=2)) == 2